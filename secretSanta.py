@@ -1,8 +1,17 @@
 import random
-from typing import List, Dict, Set, Tuple, Optional
-from collections import defaultdict
+from typing import List, Dict, Set, Tuple, Optional, Iterator, Callable
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+import itertools
+import math
+import multiprocessing
 import time
 
+from secretSanta_cache import SolutionCache, problem_fingerprint, pack_perms, unpack_perms
+from secretSanta_packed import PackedAssignments
+from secretSanta_constraints import Constraints, has_reciprocal
+
 def count_overlaps(assignments1: Dict[str, List[str]], assignments2: Dict[str, List[str]]) -> int:
     """
     Zählt die Anzahl der Übereinstimmungen zwischen zwei Zuordnungen.
@@ -15,6 +24,286 @@ def count_overlaps(assignments1: Dict[str, List[str]], assignments2: Dict[str, L
     return overlaps
 
 
+def overlap_details(new_list: Dict[str, List[str]], old_list: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Wiederholte Empfänger pro Giver (nur Giver mit Überschneidung, sortiert).
+    Für viele Zuordnungen auf einmal siehe PackedAssignments.score / overlap_details.
+    """
+    details = {}
+    for giver in sorted(new_list.keys()):
+        common = set(new_list[giver]) & set(old_list.get(giver, []))
+        if common:
+            details[giver] = sorted(common)
+    return details
+
+
+def history_weights(years: int, decay: float = 0.5, scale: int = 10) -> List[int]:
+    """
+    Ganzzahlige, abfallende Gewichte für `years` Vorjahre (neuestes zuerst):
+    round(scale * decay^k), mindestens 1.
+    """
+    return [max(1, round(scale * decay ** k)) for k in range(years)]
+
+
+def _min_cost_flow(num_nodes: int, arcs: List[Tuple[int, int, int, int]],
+                   source: int, sink: int, demand: int,
+                   deadline: float = float('inf')) -> Optional[Tuple[int, List[int]]]:
+    """
+    Min-Cost-Flow mit sukzessiven kürzesten Wegen (Dijkstra mit Potentialen).
+    Alle Kosten müssen nicht-negativ sein.
+    
+    Args:
+        arcs: Kanten als (von, nach, Kapazität, Kosten)
+        deadline: Zeitpunkt (time.time()), nach dem vor dem nächsten kürzesten
+            Weg mit TimeoutError abgebrochen wird
+    
+    Returns:
+        (Gesamtkosten, Fluss pro Kante in der Reihenfolge von `arcs`) oder None,
+        falls `demand` nicht geroutet werden kann
+    """
+    # Kante i und ihre Rückkante i ^ 1 liegen nebeneinander
+    to, cap, cost = [], [], []
+    graph = [[] for _ in range(num_nodes)]
+    for u, v, c, w in arcs:
+        graph[u].append(len(to))
+        to.append(v); cap.append(c); cost.append(w)
+        graph[v].append(len(to))
+        to.append(u); cap.append(0); cost.append(-w)
+    
+    inf = float('inf')
+    potential = [0] * num_nodes
+    flow = 0
+    total_cost = 0
+    
+    while flow < demand:
+        if time.time() >= deadline:
+            raise TimeoutError("Min-Cost-Flow: Zeitlimit erreicht")
+        dist = [inf] * num_nodes
+        prev_edge = [-1] * num_nodes
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            pu = potential[u]
+            for e in graph[u]:
+                if cap[e] > 0:
+                    v = to[e]
+                    nd = d + cost[e] + pu - potential[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        prev_edge[v] = e
+                        heapq.heappush(heap, (nd, v))
+        
+        if dist[sink] == inf:
+            return None
+        
+        for v in range(num_nodes):
+            if dist[v] < inf:
+                potential[v] += dist[v]
+        
+        # Engpass entlang des gefundenen Weges
+        push = demand - flow
+        v = sink
+        while v != source:
+            e = prev_edge[v]
+            push = min(push, cap[e])
+            v = to[e ^ 1]
+        
+        v = sink
+        while v != source:
+            e = prev_edge[v]
+            cap[e] -= push
+            cap[e ^ 1] += push
+            total_cost += push * cost[e]
+            v = to[e ^ 1]
+        flow += push
+    
+    return total_cost, [cap[2 * i + 1] for i in range(len(arcs))]
+
+
+def _hungarian(cost: List[List[int]]) -> List[int]:
+    """
+    Ungarische Methode (O(n³)) für eine quadratische Kostenmatrix.
+    Gibt für jede Zeile (Giver) die zugeordnete Spalte (Empfänger) zurück.
+    """
+    n = len(cost)
+    inf = float('inf')
+    # 1-basierte Potentiale u (Zeilen), v (Spalten); p[j] = Zeile in Spalte j
+    u = [0] * (n + 1)
+    v = [0] * (n + 1)
+    p = [0] * (n + 1)
+    way = [0] * (n + 1)
+    
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (n + 1)
+        used = [False] * (n + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            delta = inf
+            j1 = 0
+            for j in range(1, n + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(n + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+    
+    assignment = [0] * n
+    for j in range(1, n + 1):
+        assignment[p[j] - 1] = j - 1
+    return assignment
+
+
+def _split_regular_graph(adjacency: List[Set[int]], rounds: int) -> Optional[List[List[int]]]:
+    """
+    Zerlegt einen `rounds`-regulären bipartiten Graphen (Giver i -> Empfänger j)
+    in `rounds` perfekte Matchings (Satz von König). Jedes Matching ist eine Runde.
+    """
+    n = len(adjacency)
+    remaining = [set(neighbours) for neighbours in adjacency]
+    result = []
+    
+    for _ in range(rounds):
+        match_of_receiver = [-1] * n
+        
+        def augment(giver: int, visited: Set[int]) -> bool:
+            for receiver in remaining[giver]:
+                if receiver in visited:
+                    continue
+                visited.add(receiver)
+                if match_of_receiver[receiver] == -1 or augment(match_of_receiver[receiver], visited):
+                    match_of_receiver[receiver] = giver
+                    return True
+            return False
+        
+        for giver in range(n):
+            if not augment(giver, set()):
+                return None
+        
+        perm = [0] * n
+        for receiver, giver in enumerate(match_of_receiver):
+            perm[giver] = receiver
+            remaining[giver].discard(receiver)
+        result.append(perm)
+    
+    return result
+
+
+def _quiet(*args, **kwargs):
+    """Ersatz für print im stillen Modus."""
+
+
+# Gemeinsame Zähler der noch freien und der reservierten, noch nicht
+# abgerechneten Lösungen (nur in Worker-Prozessen gesetzt)
+_shared_remaining = None
+_shared_outstanding = None
+
+
+def _init_worker(remaining, outstanding):
+    """Initializer für Worker-Prozesse der parallelen Suche."""
+    global _shared_remaining, _shared_outstanding
+    _shared_remaining = remaining
+    _shared_outstanding = outstanding
+
+
+def _claim_solutions(settled: int, chunk: int = 256) -> int:
+    """
+    Rechnet die vollständig verbrauchte Reservierung `settled` ab und reserviert
+    bis zu `chunk` weitere Lösungen vom gemeinsamen max_solutions-Budget.
+    
+    Ist das Budget leer, halten andere Teilbäume aber noch Reservierungen, wird
+    gewartet, bis diese verbraucht oder zurückgegeben sind (_release_solutions).
+    0 bedeutet daher, dass das Limit tatsächlich erreicht ist (gemeinsamer
+    Early-Stop), und die Gesamtzahl entspricht der seriellen Suche.
+    """
+    while True:
+        with _shared_remaining.get_lock():
+            _shared_outstanding.value -= settled
+            settled = 0
+            granted = min(chunk, _shared_remaining.value)
+            if granted or not _shared_outstanding.value:
+                _shared_remaining.value -= granted
+                _shared_outstanding.value += granted
+                return granted
+        time.sleep(0.001)
+
+
+def _release_solutions(settled: int, unused: int):
+    """Schließt die Reservierung `settled` eines Teilbaums ab und gibt `unused` Lösungen zurück."""
+    with _shared_remaining.get_lock():
+        _shared_outstanding.value -= settled
+        _shared_remaining.value += unused
+
+
+def _solve_subtree(solver: 'OptimizedSecretSantaSolver', max_overlap: int,
+                   prefix: Tuple[int, ...], seed: int, samples: int = 1) -> Dict:
+    """Worker-Task: Durchsucht den Teilbaum unter einem Präfix von Runde 0."""
+    random.seed(seed)
+    stats = solver._reduce_solutions(max_overlap, prefix=prefix, claim=_claim_solutions,
+                                     release=_release_solutions, show_progress=False,
+                                     samples=samples)
+    stats['nodes'] = solver.total_nodes_explored
+    stats['pruned'] = (solver.pruned_overlap, solver.pruned_bound, solver.pruned_matching)
+    stats['tt'] = (solver.tt_hits, solver.tt_misses, solver.tt_evictions)
+    stats['budget_exhausted'] = solver.budget_exhausted
+    return stats
+
+
+# Slots eines Stack-Frames von _search (siehe _new_frame)
+_F_ROUND = 0         # Runde
+_F_GIVER = 1         # Giver, dessen Empfänger gerade gewählt wird
+_F_USED = 2          # in dieser Runde bereits vergebene Empfänger (Bitmaske)
+_F_OVERLAP = 3       # Overlap bzw. Score bis hierher
+_F_MATCHING = 4      # perfektes Matching der offenen Giver auf die freien Empfänger
+_F_AVAILABLE = 5     # noch zu probierende Empfänger (Bitmaske; bei ordering='mrv' eine
+                     # Liste von Bits, deren letztes als nächstes probiert wird)
+_F_ASSIGNED = 6      # aktuell zugeordnetes Bit (0 = keins)
+_F_FIRST_MASK = 7    # erlaubte Empfänger von Teilnehmer 0 in dieser Runde
+_F_PREV_EDGES = 8    # Kanten früherer Runden (je Bit g * n + r)
+_F_ROUND_EDGES = 9   # Kanten dieser Runde (je Bit g * n + r)
+_F_LEAVES = 10       # Lösungen bei Eintritt (Transpositionstabelle)
+_F_BUDGET = 11       # Rest-Budget bis zum Overlap-Limit
+_F_FUTURE = 12       # Schranke späterer Runden über alle Giver (_future_bound)
+_F_FUTURE_OWN = 13   # Anteil des Givers an _F_FUTURE
+_F_ROUND_BOUND = 14  # Schranke der aktuellen Runde (siehe _round_bound)
+_F_OPEN = 15         # danach noch offene Giver dieser Runde (Bitmaske)
+
+
+def _new_frame(round_idx: int, giver: int, used: int, overlap: int, matching,
+               available, first_mask: int, prev_edges: int, round_edges: int,
+               leaves: int, budget: int, future: int = 0, future_own: int = 0,
+               round_bound: Tuple[int, Dict[int, int]] = (0, {}),
+               open_givers: int = 0) -> List:
+    """Stack-Frame für _search; die Slots sind über die _F_*-Konstanten benannt."""
+    return [round_idx, giver, used, overlap, matching, available, 0, first_mask,
+            prev_edges, round_edges, leaves, budget, future, future_own, round_bound,
+            open_givers]
+
+
 class OptimizedSecretSantaSolver:
     """
     Optimierter Solver mit Iterative Deepening und erweiterten Pruning-Strategien.
@@ -22,7 +311,53 @@ class OptimizedSecretSantaSolver:
     
     def __init__(self, participants: List[str], rounds: int, 
                  liste1: Optional[Dict[str, List[str]]] = None,
-                 liste2: Optional[Dict[str, List[str]]] = None):
+                 liste2: Optional[Dict[str, List[str]]] = None,
+                 symmetry_breaking: bool = False,
+                 transposition_table_size: int = 0,
+                 history: Optional[List[Dict[str, List[str]]]] = None,
+                 decay: float = 0.5,
+                 lower_bound: bool = True,
+                 ordering: str = 'fixed',
+                 verbose: bool = True,
+                 progress: Optional[Callable[[Dict], None]] = None,
+                 constraints: Optional[Constraints] = None):
+        """
+        Args:
+            history: Beliebig viele Vorjahreslisten, neueste zuerst. Ersetzt
+                liste1/liste2: Die Listen werden einmalig mit abfallenden Gewichten
+                (history_weights) zu einer Strafmatrix verrechnet, und die Suche
+                minimiert direkt den gewichteten Gesamtscore.
+            decay: Gewichtsfaktor pro Jahr zurück (siehe history_weights)
+            symmetry_breaking: Jede Menge von Runden nur in kanonischer Reihenfolge
+                suchen (bis zu rounds! weniger Knoten). Zählungen und die zufällige
+                Auswahl in solve() beziehen sich weiterhin auf geordnete Zuordnungen.
+            transposition_table_size: Maximale Einträge der LRU-Tabelle bekannter
+                toter Teilzustände (0 = aus). Die Tabelle bleibt über alle
+                Overlap-Level und Aufrufe dieses Solvers hinweg gültig.
+            lower_bound: Zweige abschneiden, deren Overlap plus untere Schranke
+                für die restlichen Giver das Limit übersteigt (siehe _search)
+            ordering: 'fixed' (Giver in Teilnehmer-Reihenfolge, Empfänger nach Index)
+                oder 'mrv' (Giver mit den wenigsten Optionen zuerst, straffreie und
+                wenig einschränkende Empfänger zuerst; siehe _choose_giver). Ändert nur
+                die Reihenfolge der Lösungen, nicht ihre Menge; vor allem die erste
+                Lösung (z.B. über iter_solutions) kommt damit meist deutlich früher.
+            verbose: Fortschritt und Ergebnisse auf stdout ausgeben. Mit False
+                schreibt der Solver nichts; die Suche selbst gibt nie etwas aus
+                (außer mit self.debug).
+            progress: Callback, der Metrik-Dictionaries erhält, jeweils mit 'event':
+                'level_start' (level), 'solutions' (level, solutions, nodes,
+                nodes_per_sec, time_elapsed; alle 100 Lösungen), 'level_done'
+                (siehe _level_metrics) und 'done' (level, solutions, search_complete,
+                time_elapsed). Wird in Worker-Prozessen nicht aufgerufen.
+            constraints: Zusätzliche Regeln (secretSanta_constraints). Ausschlüsse
+                und Paare entfernen Kanten aus den erlaubten Empfängern, gelten
+                damit für Suche, Schranken, Matching, Min-Cost-Flow und
+                count_solutions. no_reciprocal wird in der Suche pro Kante geprüft;
+                die Flow-basierten Verfahren können es nicht ausdrücken (siehe
+                solve_min_cost, repair), count_solutions unterstützt es nicht.
+        """
+        if ordering not in ('fixed', 'mrv'):
+            raise ValueError(f"Unbekannte Ordnung: {ordering}")
         self.participants = participants
         self.n = len(participants)
         self.rounds = rounds
@@ -32,12 +367,110 @@ class OptimizedSecretSantaSolver:
         # Vorberechnete Overlap-Informationen für schnelleres Pruning
         self.liste1_overlaps = self._precompute_overlap_matrix(liste1) if liste1 else {}
         
+        # Integer-Repräsentation für die Suche: Teilnehmer i <-> Bit i.
+        # Namen werden erst beim Ausgeben einer Lösung zurückübersetzt.
+        self._index = {p: i for i, p in enumerate(participants)}
+        self._full_mask = (1 << self.n) - 1
+        self._allowed = [self._full_mask & ~(1 << i) for i in range(self.n)]
+        self.constraints = constraints
+        self._no_reciprocal = bool(constraints and constraints.no_reciprocal)
+        if constraints:
+            self._allowed = [a & ~m for a, m in zip(self._allowed,
+                                                    constraints.forbidden_masks(participants))]
+        self._liste1_masks = self._precompute_overlap_masks(self.liste1)
+        self._liste2_masks = self._precompute_overlap_masks(self.liste2)
+        
+        # Strafmatrix penalty[g][r]: Kosten der Kante g -> r in der Suche.
+        # Ohne Historie ist das die 0/1-Matrix von Liste 1.
+        self.history = history or []
+        self.history_weights = history_weights(len(self.history), decay)
+        if self.history:
+            self._penalty = self._compile_penalty_matrix(self.history, self.history_weights)
+        else:
+            self._penalty = [[mask >> r & 1 for r in range(self.n)] for mask in self._liste1_masks]
+        # Bitmaske der Empfänger mit positiver Strafe (schneller Test in der Suche)
+        self._penalty_masks = [sum(1 << r for r, p in enumerate(row) if p) for row in self._penalty]
+        # Strafbehaftete Empfänger je Giver, aufsteigend nach Strafe (für die untere Schranke)
+        self._penalty_order = [sorted((p, 1 << r) for r, p in enumerate(row) if p)
+                               for row in self._penalty]
+        self._zero_allowed = [a & ~m for a, m in zip(self._allowed, self._penalty_masks)]
+        self.lower_bound = lower_bound
+        self.ordering = ordering
+        
+        # Symmetriebrechung: Runden sind vertauschbar (count_overlaps ist
+        # reihenfolgeunabhängig), daher genügt eine kanonische Reihenfolge
+        self.symmetry_breaking = symmetry_breaking
+        self._orderings = math.factorial(rounds) if symmetry_breaking else 1
+        self._first_giver_mask = self._full_mask
+        
+        # Transpositionstabelle: Zustand -> größtes Rest-Overlap-Budget, unter dem
+        # der Teilbaum nachweislich keine Lösung enthält (LRU-begrenzt)
+        self.transposition_table_size = transposition_table_size
+        self._transposition = OrderedDict()
+        
+        # Zähltabelle von count_solutions: (Overlap-Limit, Zustand -> Zählvektor)
+        self._count_table = None
+        
+        # DEBUG-Ausgaben der Suche (teuer, daher standardmäßig aus)
+        self.debug = False
+        
+        # Ausgabe: stdout nur bei verbose, Metriken über den progress-Callback
+        self.verbose = verbose
+        self.progress = progress
+        self._log = print if verbose else _quiet
+        
+        # Budget der laufenden Suche (nur während solve(time_budget=..., node_budget=...))
+        self._deadline = float('inf')
+        self._node_limit = float('inf')
+        self.budget_exhausted = False
+        
         # Statistiken
-        self.solutions_found = []
         self.total_nodes_explored = 0
-        self.total_branches_pruned = 0
+        self.pruned_overlap = 0
+        self.pruned_bound = 0
+        self.pruned_matching = 0
+        self.tt_hits = 0
+        self.tt_misses = 0
+        self.tt_evictions = 0
         self.search_start_time = None
+        self._level_start_time = None
         
+    @property
+    def total_branches_pruned(self) -> int:
+        """Summe der verworfenen Zweige über alle Gründe (Overlap, Schranke, Matching)."""
+        return self.pruned_overlap + self.pruned_bound + self.pruned_matching
+    
+    def __getstate__(self):
+        # Der Callback wird nicht an Worker-Prozesse übertragen (oft nicht picklebar),
+        # die Zähltabelle von count_solutions wird dort nicht gebraucht
+        state = self.__dict__.copy()
+        state['progress'] = None
+        state['_log'] = _quiet
+        state['_count_table'] = None
+        return state
+    
+    def _emit(self, event: str, **metrics):
+        """Meldet ein Ereignis samt Metriken an den progress-Callback (falls gesetzt)."""
+        if self.progress is not None:
+            metrics['event'] = event
+            self.progress(metrics)
+    
+    def _level_metrics(self, level: int, elapsed: float, count: int) -> Dict:
+        """Metriken eines abgeschlossenen Overlap-Levels für den progress-Callback."""
+        return {
+            'level': level,
+            'solutions': count,
+            'nodes': self.total_nodes_explored,
+            'nodes_per_sec': self.total_nodes_explored / elapsed if elapsed > 0 else 0.0,
+            'pruned_overlap': self.pruned_overlap,
+            'pruned_bound': self.pruned_bound,
+            'pruned_matching': self.pruned_matching,
+            'tt_hits': self.tt_hits,
+            'tt_misses': self.tt_misses,
+            'tt_evictions': self.tt_evictions,
+            'time_elapsed': elapsed
+        }
+    
     def _precompute_overlap_matrix(self, liste: Dict[str, List[str]]) -> Dict[Tuple[str, str], bool]:
         """
         Vorberechnung: Welche Giver->Receiver Paare existieren in der Liste?
@@ -49,293 +482,1470 @@ class OptimizedSecretSantaSolver:
                 overlap_set[(giver, receiver)] = True
         return overlap_set
     
-    def solve(self, max_solutions_per_level: int = 1000000) -> Optional[Dict]:
+    def _precompute_overlap_masks(self, liste: Dict[str, List[str]]) -> List[int]:
+        """
+        Wie _precompute_overlap_matrix, aber als Bitmaske pro Giver-Index:
+        Bit j in masks[i] gesetzt <=> participants[i] -> participants[j] steht in der Liste.
+        """
+        masks = [0] * self.n
+        for giver, receivers in liste.items():
+            g = self._index.get(giver)
+            if g is None:
+                continue
+            for receiver in receivers:
+                r = self._index.get(receiver)
+                if r is not None:
+                    masks[g] |= 1 << r
+        return masks
+    
+    def _compile_penalty_matrix(self, lists: List[Dict[str, List[str]]],
+                                weights: List[int]) -> List[List[int]]:
+        """Verrechnet mehrere Listen mit ihren Gewichten zu einer dichten n x n Strafmatrix."""
+        penalty = [[0] * self.n for _ in range(self.n)]
+        for liste, weight in zip(lists, weights):
+            for g, mask in enumerate(self._precompute_overlap_masks(liste)):
+                row = penalty[g]
+                while mask:
+                    bit = mask & -mask
+                    mask ^= bit
+                    row[bit.bit_length() - 1] += weight
+        return penalty
+    
+    def solve(self, max_solutions_per_level: int = 1000000,
+              keep_candidates: bool = False, workers: int = 1,
+              time_budget: Optional[float] = None,
+              node_budget: Optional[int] = None,
+              cache: Optional['SolutionCache'] = None,
+              exact_count: bool = False) -> Optional[Dict]:
         """
-        Iterative Deepening: Suche zuerst nach Lösungen mit 0 Überschneidungen,
-        dann 1, dann 2, etc. Stoppt beim ersten erfolgreichen Level.
+        Iterative Deepening: Suche zuerst nach Lösungen mit x Überschneidungen,
+        dann x+1, x+2, etc. Stoppt beim ersten erfolgreichen Level. x ist die
+        Min-Cost-Flow-Schranke (siehe solve_min_cost), kleinere Level sind
+        beweisbar leer.
+        
+        Mit `history` wird stattdessen der gewichtete Gesamtscore beschränkt; die
+        Suche prunt jeden Zweig, dessen Score das Level übersteigt, und ein
+        zweiter Durchlauf über Liste 2 entfällt.
+        
+        Die Lösungen eines Levels werden gestreamt und nicht gespeichert: Bester
+        Liste-2-Score, dessen Histogramm und eine gleichverteilte Auswahl unter den
+        besten Kandidaten (Reservoir Sampling) benötigen nur O(1) Speicher.
         
         Args:
             max_solutions_per_level: Maximale Anzahl Lösungen pro Overlap-Level
+            keep_candidates: Alle Lösungen des optimalen Levels zusätzlich als
+                'all_candidates_with_x' zurückgeben (PackedAssignments: n · rounds
+                Bytes pro Lösung, Namens-Dictionaries erst beim Zugriff)
+            workers: Anzahl Prozesse. Bei > 1 wird der Suchbaum an den ersten
+                Givern von Runde 0 in unabhängige Teilbäume zerlegt, die parallel
+                in einem ProcessPoolExecutor durchsucht werden.
+            time_budget: Maximale Rechenzeit in Sekunden (Anytime-Modus)
+            node_budget: Maximale Anzahl Suchknoten über alle Level (nur workers=1)
+            cache: SolutionCache (secretSanta_cache). Ist das Problem (siehe
+                fingerprint) bereits gelöst, entfällt die Suche: Level, Zählungen
+                und Histogramm kommen aus dem Cache, die Zuordnung wird zufällig
+                aus den gespeicherten Stichproben-Lösungen gewählt. Nur vollständige
+                Suchen werden gespeichert; mit keep_candidates wird der Cache
+                nicht verwendet.
+            exact_count: Hat das optimale Level max_solutions_per_level erreicht,
+                die Lösungsanzahl exakt per count_solutions bestimmen (nur für
+                kleine Gruppen). Liste-2-Statistiken beziehen sich weiterhin auf
+                die aufgezählten Lösungen.
+        
+        Anytime-Modus: Ist ein Budget erschöpft, wird die beste bis dahin gefundene
+        Lösung zurückgegeben. Wurde noch keine gefunden, wird auf die Min-Cost-Flow-
+        Lösung (solve_min_cost) zurückgegriffen, die in Polynomialzeit vorliegt.
+        Die Min-Cost-Schranke vor der Suche nutzt höchstens die Hälfte von
+        time_budget; nur dieser letzte Rückfall (keine Lösung gefunden) kann das
+        Zeitbudget überschreiten.
+        Das Ergebnis enthält dann 'search_complete' (Suche regulär beendet) und
+        'optimal_proven' (Overlap bzw. Score und Liste-2-Overlap nachweislich
+        minimal; bei abgebrochenem Level ist nur der Liste-1-Overlap bewiesen).
         """
         self.search_start_time = time.time()
         self.max_solutions = max_solutions_per_level
+        if node_budget is not None and workers > 1:
+            raise ValueError("node_budget wird bei workers > 1 nicht unterstützt")
+        if keep_candidates and workers > 1:
+            raise ValueError("keep_candidates wird bei workers > 1 nicht unterstützt")
+        if exact_count and self._no_reciprocal:
+            raise ValueError("exact_count unterstützt die Regel no_reciprocal nicht")
+        self._deadline = self.search_start_time + time_budget if time_budget is not None else float('inf')
+        self._node_limit = float('inf')
+        self.budget_exhausted = False
+        nodes_spent = 0
         
-        print(f"{'='*70}")
-        print(f"OPTIMIERTE SYSTEMATISCHE SUCHE - ITERATIVE DEEPENING")
-        print(f"{'='*70}")
-        print(f"Teilnehmer: {self.n}, Runden: {self.rounds}")
-        print(f"Sammle maximal {max_solutions_per_level:,} Lösungen pro Level\n")
+        self._log(f"{'='*70}")
+        self._log(f"OPTIMIERTE SYSTEMATISCHE SUCHE - ITERATIVE DEEPENING")
+        self._log(f"{'='*70}")
+        self._log(f"Teilnehmer: {self.n}, Runden: {self.rounds}")
+        self._log(f"Sammle maximal {max_solutions_per_level:,} Lösungen pro Level\n")
         
-        # Theoretisches Maximum: jeder könnte alle 3 überschneiden
-        max_possible_overlap = self.n * self.rounds
+        cache_key = None
+        if cache is not None and not keep_candidates:
+            cache_key = self.fingerprint(max_solutions_per_level)
+            entry = cache.get(cache_key)
+            if entry is not None:
+                self._log(f"💾 Ergebnis aus dem Cache ({cache.path})")
+                return self._finish_solve(*self._stats_from_cache(entry), search_complete=True,
+                                          optimal_proven=entry['optimal_proven'],
+                                          keep_candidates=False, exact_count=exact_count,
+                                          cached=True)
         
-        # Iterative Deepening: Versuche jedes Overlap-Level
-        for target_overlap in range(max_possible_overlap + 1):
-            print(f"{'─'*70}")
-            print(f"Suche nach Lösungen mit maximal {target_overlap} Überschneidungen zu Liste 1...")
-            print(f"{'─'*70}")
-            
-            self.solutions_found = []
-            self.total_nodes_explored = 0
-            self.total_branches_pruned = 0
-            level_start_time = time.time()
-            
-            # Suche mit diesem Overlap-Limit
-            self._backtrack_all_rounds(target_overlap)
-            
-            level_elapsed = time.time() - level_start_time
-            
-            # Neue Zeile nach dem Progress-Update
-            if self.solutions_found:
-                print()  # Neue Zeile nach der letzten \r-Ausgabe
-            
-            print(f"\n  Ergebnis für Overlap-Level {target_overlap}:")
-            print(f"  • Knoten erkundet: {self.total_nodes_explored:,}")
-            print(f"  • Branches gepruned: {self.total_branches_pruned:,}")
-            print(f"  • Zeit: {level_elapsed:.2f}s")
-            print(f"  • Lösungen gefunden: {len(self.solutions_found)}")
-            
-            # Wenn wir Lösungen gefunden haben, sind wir fertig!
-            if self.solutions_found:
-                print(f"\n✓ Optimales Overlap-Level gefunden: {target_overlap}")
-                break
+        # Untere Schranke aus dem Min-Cost-Flow (ohne no_reciprocal sogar exakt):
+        # Level darunter sind beweisbar leer und werden gar nicht erst durchsucht.
+        # Mit Zeitbudget darf der Flow höchstens dessen Hälfte kosten, sonst
+        # beginnt die Suche ohne Schranke bei Level 0.
+        flow_deadline = (self.search_start_time + time_budget / 2 if time_budget is not None
+                         else float('inf'))
+        flow_timed_out = False
+        try:
+            flow_result = self._min_cost_rounds(self._flow_cost_matrix(), flow_deadline)
+        except TimeoutError:
+            self._log(f"⏱️  Min-Cost-Schranke nicht rechtzeitig fertig, starte bei Level 0\n")
+            flow_result = None
+            flow_timed_out = True
+        if self.history:
+            first_level = flow_result[0] if flow_result else 0
+            max_possible_overlap = sum(sum(sorted(row, reverse=True)[:self.rounds])
+                                       for row in self._penalty)
+            level_label = "Score (gewichtete Historie)"
+        else:
+            first_level = flow_result[0] // (self.n * self.rounds + 1) if flow_result else 0
+            # Theoretisches Maximum: jeder könnte alle 3 überschneiden
+            max_possible_overlap = self.n * self.rounds
+            level_label = "Überschneidungen zu Liste 1"
+        
+        executor = None
+        if workers > 1:
+            remaining = multiprocessing.Value('q', 0)
+            outstanding = multiprocessing.Value('q', 0)
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(remaining, outstanding))
+            self._log(f"Parallele Suche mit {workers} Prozessen\n")
+        
+        try:
+            # Iterative Deepening: Versuche jedes Overlap-Level
+            for target_overlap in range(first_level, max_possible_overlap + 1):
+                self._log(f"{'─'*70}")
+                self._log(f"Suche nach Lösungen mit maximal {target_overlap} {level_label}...")
+                self._log(f"{'─'*70}")
+                
+                level_start_time = time.time()
+                self._level_start_time = level_start_time
+                self._emit('level_start', level=target_overlap)
+                if node_budget is not None:
+                    self._node_limit = node_budget - nodes_spent
+                
+                # Suche mit diesem Overlap-Limit
+                if executor is None:
+                    stats = self._reduce_solutions(target_overlap, keep_candidates,
+                                                   samples=cache.samples if cache_key else 1)
+                else:
+                    remaining.value = max_solutions_per_level
+                    outstanding.value = 0
+                    stats = self._reduce_solutions_parallel(executor, target_overlap, workers,
+                                                            samples=cache.samples if cache_key else 1)
+                
+                level_elapsed = time.time() - level_start_time
+                
+                # Neue Zeile nach dem Progress-Update
+                if stats['count']:
+                    self._log()  # Neue Zeile nach der letzten \r-Ausgabe
+                
+                self._log(f"\n  Ergebnis für Overlap-Level {target_overlap}:")
+                self._log(f"  • Knoten erkundet: {self.total_nodes_explored:,}")
+                self._log(f"  • Branches gepruned: {self.total_branches_pruned:,} "
+                          f"(Overlap {self.pruned_overlap:,}, Schranke {self.pruned_bound:,}, "
+                          f"Matching {self.pruned_matching:,})")
+                if self.transposition_table_size:
+                    self._log(f"  • Transpositionstabelle: {self.tt_hits:,} Treffer, "
+                              f"{self.tt_misses:,} Fehlschläge, {self.tt_evictions:,} verdrängt")
+                self._log(f"  • Zeit: {level_elapsed:.2f}s")
+                self._log(f"  • Lösungen gefunden: {stats['count']}")
+                nodes_spent += self.total_nodes_explored
+                if self.progress is not None:
+                    self._emit('level_done', **self._level_metrics(target_overlap, level_elapsed, stats['count']))
+                
+                # Wenn wir Lösungen gefunden haben, sind wir fertig!
+                if stats['count']:
+                    self._log(f"\n✓ Optimales Overlap-Level gefunden: {target_overlap}")
+                    break
+                if self.budget_exhausted:
+                    break
+        finally:
+            if executor is not None:
+                # Auch bei Ausnahmen (z.B. KeyboardInterrupt) den Pool beenden
+                executor.shutdown(cancel_futures=True)
+        
+        search_complete = not self.budget_exhausted
+        optimal_proven = search_complete and (not self.liste2 or not stats['limit_reached'])
+        self._deadline = float('inf')
+        self._node_limit = float('inf')
         
+        if not search_complete:
+            self._log(f"\n⏱️  Budget erschöpft nach {nodes_spent:,} Knoten "
+                      f"({time.time() - self.search_start_time:.2f}s)")
+            if stats['count'] and (self.history or not self.liste2):
+                # Alle kleineren Level sind vollständig gescheitert
+                optimal_proven = True
+            elif stats['count'] and flow_timed_out:
+                # Der Flow passt nicht ins Budget: gefundene Lösung behalten
+                pass
+            else:
+                # Min-Cost-Flow ist lexikographisch optimal (Liste 1, dann Liste 2)
+                fallback, level = self._flow_fallback(flow_result)
+                if fallback['count'] and (not stats['count'] or
+                                          (level, fallback['best_score']) <
+                                          (target_overlap, stats['best_score'])):
+                    self._log(f"   Verwende Min-Cost-Flow-Lösung")
+                    stats, target_overlap = fallback, level
+                optimal_proven = fallback['count'] > 0
+        
+        if cache_key is not None and search_complete and stats['count']:
+            self._store_in_cache(cache, cache_key, target_overlap, stats, optimal_proven)
+        
+        return self._finish_solve(stats, target_overlap, search_complete, optimal_proven,
+                                  keep_candidates, exact_count)
+    
+    def _finish_solve(self, stats: Dict, target_overlap: int, search_complete: bool,
+                      optimal_proven: bool, keep_candidates: bool, exact_count: bool = False,
+                      cached: bool = False) -> Optional[Dict]:
+        """Wählt die Zuordnung aus dem Reduktionsergebnis, gibt sie aus und baut das Ergebnis."""
         total_elapsed = time.time() - self.search_start_time
+        self._emit('done', level=target_overlap if stats['count'] else None, solutions=stats['count'],
+                   search_complete=search_complete, time_elapsed=total_elapsed)
         
-        if not self.solutions_found:
-            print(f"\n❌ Keine gültige Lösung gefunden!")
+        if not stats['count']:
+            self._log(f"\n❌ Keine gültige Lösung gefunden!")
             return None
         
         x = target_overlap
-        candidates_with_x = self.solutions_found
+        total_with_x = stats['count']
+        enumerated = total_with_x
+        if exact_count and stats['limit_reached']:
+            total_with_x = self.count_solutions(x)[x]
+            self._log(f"\n🔢 Exakte Anzahl Lösungen mit Level {x}: {total_with_x:,} "
+                      f"(aufgezählt: {enumerated:,})")
+        chosen_perms = stats['chosen']
+        if self.symmetry_breaking:
+            # Kanonische Lösung -> zufällige Rundenreihenfolge (gleichverteilt)
+            random.shuffle(chosen_perms)
+        chosen_assignment = self._assignment_from_perms(chosen_perms)
+        
+        self._log(f"\n{'='*70}")
+        self._log(f"SUCHE ABGESCHLOSSEN")
+        self._log(f"{'='*70}\n")
+        
+        if self.history:
+            overlaps_per_year = [count_overlaps(chosen_assignment, liste) for liste in self.history]
+            self._log(f"📊 ERGEBNISSE - Gewichtete Historie ({len(self.history)} Jahre):")
+            self._log(f"   Minimaler Score: {x}")
+            self._log(f"   Anzahl Listen mit Score {x}: {total_with_x}")
+            for year, (overlap, weight) in enumerate(zip(overlaps_per_year, self.history_weights), 1):
+                self._log(f"   Jahr -{year}: {overlap} Überschneidungen (Gewicht {weight})")
+            result = {
+                'assignment': chosen_assignment,
+                'score': x,
+                'total_with_min_score': total_with_x,
+                'overlaps_per_year': overlaps_per_year,
+                'nodes_explored': self.total_nodes_explored,
+                'branches_pruned': self.total_branches_pruned,
+                'tt_hits': self.tt_hits,
+                'tt_misses': self.tt_misses,
+                'tt_evictions': self.tt_evictions,
+                'search_complete': search_complete,
+                'optimal_proven': optimal_proven,
+                'cached': cached,
+                'time_elapsed': total_elapsed
+            }
+            if keep_candidates:
+                result['all_candidates_with_x'] = stats['candidates']
+            return result
         
-        print(f"\n{'='*70}")
-        print(f"SUCHE ABGESCHLOSSEN")
-        print(f"{'='*70}\n")
+        self._log(f"📊 ERGEBNISSE - Überschneidungen mit Liste 1:")
+        self._log(f"   Minimale Überschneidungen (x): {x}")
+        self._log(f"   Anzahl Listen mit {x} Überschneidungen: {total_with_x}")
         
-        print(f"📊 ERGEBNISSE - Überschneidungen mit Liste 1:")
-        print(f"   Minimale Überschneidungen (x): {x}")
-        print(f"   Anzahl Listen mit {x} Überschneidungen: {len(candidates_with_x)}")
+        result = {
+            'assignment': chosen_assignment,
+            'overlap_liste1': x,
+            'total_with_x_overlap_liste1': total_with_x,
+            'nodes_explored': self.total_nodes_explored,
+            'branches_pruned': self.total_branches_pruned,
+            'tt_hits': self.tt_hits,
+            'tt_misses': self.tt_misses,
+            'tt_evictions': self.tt_evictions,
+            'search_complete': search_complete,
+            'optimal_proven': optimal_proven,
+            'cached': cached,
+            'time_elapsed': total_elapsed
+        }
+        if keep_candidates:
+            result['all_candidates_with_x'] = stats['candidates']
         
-        # Wenn liste2 gegeben, finde beste bzgl. liste2
+        # Wenn liste2 gegeben, beste bzgl. liste2 (bereits beim Streamen bestimmt)
         if self.liste2:
-            min_overlap_liste2 = float('inf')
-            best_candidates = []
-            overlap2_counts = defaultdict(int)
+            min_overlap_liste2 = stats['best_score']
+            overlap2_counts = stats['histogram']
             
-            print(f"\n   Analysiere Überschneidungen mit Liste 2...")
-            for candidate in candidates_with_x:
-                overlap2 = count_overlaps(candidate, self.liste2)
-                overlap2_counts[overlap2] += 1
-                
-                if overlap2 < min_overlap_liste2:
-                    min_overlap_liste2 = overlap2
-                    best_candidates = [candidate]
-                elif overlap2 == min_overlap_liste2:
-                    best_candidates.append(candidate)
-            
-            print(f"\n📊 ERGEBNISSE - Überschneidungen mit Liste 2:")
-            print(f"   Minimale Überschneidungen: {min_overlap_liste2}")
-            print(f"   Anzahl Listen mit {min_overlap_liste2} Überschneidungen: {len(best_candidates)}")
+            self._log(f"\n📊 ERGEBNISSE - Überschneidungen mit Liste 2:")
+            self._log(f"   Minimale Überschneidungen: {min_overlap_liste2}")
+            self._log(f"   Anzahl Listen mit {min_overlap_liste2} Überschneidungen: {stats['best_count']}")
             
-            print(f"\n📊 Verteilung der Überschneidungen mit Liste 2:")
+            self._log(f"\n📊 Verteilung der Überschneidungen mit Liste 2:")
             for overlap_count in sorted(overlap2_counts.keys()):
                 count = overlap2_counts[overlap_count]
-                percentage = (count / len(candidates_with_x)) * 100
+                percentage = (count / enumerated) * 100
                 bar = "█" * min(40, int(percentage))
-                print(f"   {overlap_count:2d} Überschneidungen: {count:5d} Listen ({percentage:5.1f}%) {bar}")
-            
-            chosen_assignment = random.choice(best_candidates)
-            
-            return {
-                'assignment': chosen_assignment,
-                'overlap_liste1': x,
-                'total_with_x_overlap_liste1': len(candidates_with_x),
-                'overlap_liste2': min_overlap_liste2,
-                'total_with_min_overlap_liste2': len(best_candidates),
-                'nodes_explored': self.total_nodes_explored,
-                'branches_pruned': self.total_branches_pruned,
-                'time_elapsed': total_elapsed,
-                'all_candidates_with_x': candidates_with_x
-            }
-        else:
-            chosen_assignment = random.choice(candidates_with_x)
+                self._log(f"   {overlap_count:2d} Überschneidungen: {count:5d} Listen ({percentage:5.1f}%) {bar}")
             
-            return {
-                'assignment': chosen_assignment,
-                'overlap_liste1': x,
-                'total_with_x_overlap_liste1': len(candidates_with_x),
-                'nodes_explored': self.total_nodes_explored,
-                'branches_pruned': self.total_branches_pruned,
-                'time_elapsed': total_elapsed,
-                'all_candidates_with_x': candidates_with_x
-            }
+            result['overlap_liste2'] = min_overlap_liste2
+            result['total_with_min_overlap_liste2'] = stats['best_count']
+        
+        return result
+    
+    def fingerprint(self, max_solutions_per_level: int = 1000000) -> str:
+        """Kanonischer Hash des Problems als Cache-Schlüssel (siehe problem_fingerprint)."""
+        return problem_fingerprint(self.participants, self.rounds, self.liste1, self.liste2,
+                                   self.history, self.history_weights, max_solutions_per_level,
+                                   self.constraints)
     
-    def _backtrack_all_rounds(self, max_overlap: int):
+    def _store_in_cache(self, cache: 'SolutionCache', key: str, level: int, stats: Dict,
+                        optimal_proven: bool):
+        meta = {
+            'n': self.n,
+            'rounds': self.rounds,
+            'level': level,
+            'count': stats['count'],
+            'best_score': stats['best_score'],
+            'best_count': stats['best_count'],
+            'histogram': sorted(stats['histogram'].items()),
+            'limit_reached': stats['limit_reached'],
+            'optimal_proven': optimal_proven
+        }
+        samples = stats['samples']
+        if self.symmetry_breaking:
+            # Kanonische Lösungen -> zufällige Rundenreihenfolge, damit auch Solver
+            # ohne Symmetriebrechung gleichverteilt aus dem Eintrag ziehen
+            samples = [random.sample(perms, len(perms)) for perms in samples]
+        cache.put(key, meta, pack_perms(samples, self.participants))
+    
+    def _stats_from_cache(self, entry: Dict) -> Tuple[Dict, int]:
+        """Reduktionsergebnis und Level aus einem Cache-Eintrag (ohne Suche)."""
+        self.total_nodes_explored = 0
+        self.pruned_overlap = self.pruned_bound = self.pruned_matching = 0
+        self.tt_hits = self.tt_misses = self.tt_evictions = 0
+        samples = unpack_perms(entry['samples'], self.participants, self.rounds)
+        histogram = defaultdict(int, entry['histogram'])
+        stats = self._reduction_result(entry['count'], entry['best_score'], entry['best_count'],
+                                       random.choice(samples), histogram, None, samples,
+                                       entry['limit_reached'])
+        return stats, entry['level']
+    
+    def _flow_fallback(self, flow_result: Optional[Tuple[int, List[List[int]]]] = None
+                       ) -> Tuple[Dict, int]:
         """
-        Backtracking über alle Runden mit Overlap-Limit.
+        Anytime-Rückfall: Min-Cost-Flow-Lösung als Reduktionsergebnis mit genau
+        einer Lösung, zusammen mit ihrem Overlap-Level (Liste 1 bzw. Score).
         """
-        assignment = {p: [] for p in self.participants}
-        current_overlap = 0
-        self._backtrack_rounds(assignment, 0, current_overlap, max_overlap)
+        if flow_result is None:
+            flow_result = self._min_cost_rounds(self._flow_cost_matrix())
+        if flow_result is None or self._violates_reciprocity(flow_result[1]):
+            return self._reduction_result(0, float('inf'), 0, None, defaultdict(int), None), 0
+        total_cost, perms = flow_result
+        if self.history:
+            level, score = total_cost, 0
+        else:
+            level, score = divmod(total_cost, self.n * self.rounds + 1)
+        histogram = defaultdict(int)
+        histogram[score] = 1
+        candidates = PackedAssignments(self.participants, self.rounds)
+        candidates.append_perms(perms)
+        return self._reduction_result(1, score, 1, perms, histogram, candidates), level
     
-    def _backtrack_rounds(self, assignment: Dict[str, List[str]], round_idx: int,
-                          current_overlap: int, max_overlap: int):
+    def _reduce_solutions(self, max_overlap: int, keep_candidates: bool = False,
+                          prefix: Tuple[int, ...] = (),
+                          claim: Optional[Callable[[int], int]] = None,
+                          release: Optional[Callable[[int, int], None]] = None,
+                          show_progress: bool = True, samples: int = 1) -> Dict:
         """
-        Rekursives Backtracking für Runden mit Overlap-Tracking.
+        Streaming-Reduktion über alle Lösungen eines Levels (bis max_solutions):
+        Zählt Lösungen, führt das Liste-2-Histogramm und zieht per Reservoir
+        Sampling eine gleichverteilte Lösung unter den Liste-2-besten.
+        
+        Args:
+            prefix: Feste Empfänger der ersten Giver von Runde 0 (Teilbaum-Suche)
+            claim: Liefert weiteres Lösungsbudget (gemeinsames Limit paralleler
+                Worker, siehe _claim_solutions); ohne claim gilt self.max_solutions
+            release: Gibt am Ende nicht verbrauchtes Budget an claim zurück
+            samples: Bei > 1 zusätzlich eine gleichverteilte Stichprobe von bis zu
+                `samples` Liste-2-besten Lösungen ziehen ('samples', für den Cache)
         """
-        # Abbruch, wenn wir genug Lösungen haben
-        if len(self.solutions_found) >= self.max_solutions:
-            return
+        n = self.n
+        liste2_masks = self._liste2_masks if self.liste2 else None
+        received = None
+        count = 0
+        held = claim(0) if claim is not None else 0
+        allowance = self.max_solutions if claim is None else held
+        best_score = float('inf')
+        best_count = 0
+        chosen = None
+        histogram = defaultdict(int)
+        candidates = PackedAssignments(self.participants, self.rounds) if keep_candidates else None
+        pool = [] if samples > 1 else None
+        limit_reached = False
+        
+        if allowance <= 0:
+            return self._reduction_result(0, best_score, 0, None, histogram, candidates,
+                                          limit_reached=True)
         
-        # DEBUG für erste paar Runden-Übergänge
-        if len(self.solutions_found) < 3 and round_idx > 0:
-            print(f"\n  DEBUG - Starte Runde {round_idx}:")
-            print(f"    Current_overlap: {current_overlap}")
-            for giver in sorted(assignment.keys())[:3]:
-                print(f"    {giver}: {assignment[giver]} (Länge: {len(assignment[giver])})")
+        # Bei Symmetriebrechung steht jede gefundene Lösung für rounds! geordnete
+        weight = self._orderings
         
-        if round_idx == self.rounds:
-            # Lösung gefunden! Validiere sie erst
-            actual_overlap = count_overlaps(assignment, self.liste1)
+        for _ in self._search(max_overlap, prefix):
+            if received is None:
+                received = self._received
+            count += weight
             
-            # DEBUG: Zeige erste paar Lösungen
-            if len(self.solutions_found) < 3:
-                print(f"\n  DEBUG - Lösung #{len(self.solutions_found) + 1} KOMPLETT:")
-                print(f"  Current_overlap tracking: {current_overlap}")
-                print(f"  Tatsächlicher Overlap: {actual_overlap}")
-                for giver in sorted(assignment.keys()):
-                    print(f"    {giver}: {assignment[giver]}")
+            if liste2_masks is not None:
+                score = 0
+                for g in range(n):
+                    score += (received[g] & liste2_masks[g]).bit_count()
+            else:
+                score = 0
+            histogram[score] += weight
             
-            if actual_overlap != current_overlap:
-                print(f"\n  ⚠️  FEHLER: Overlap-Tracking stimmt nicht!")
-                print(f"  Getrackt: {current_overlap}, Tatsächlich: {actual_overlap}")
-                return
+            if score < best_score:
+                best_score = score
+                best_count = weight
+                chosen = [perm.copy() for perm in self._round_perms]
+                if pool is not None:
+                    pool = [[perm.copy() for perm in chosen]]
+            elif score == best_score:
+                best_count += weight
+                # Reservoir Sampling (k = 1): ersetze mit Wahrscheinlichkeit weight/best_count
+                if random.randrange(best_count) < weight:
+                    chosen = [perm.copy() for perm in self._round_perms]
+                if pool is not None:
+                    # Reservoir Sampling (k = samples) über die kanonischen Lösungen
+                    if len(pool) < samples:
+                        pool.append([perm.copy() for perm in self._round_perms])
+                    else:
+                        slot = random.randrange(best_count // weight)
+                        if slot < samples:
+                            pool[slot] = [perm.copy() for perm in self._round_perms]
             
-            solution_copy = {k: v.copy() for k, v in assignment.items()}
-            self.solutions_found.append(solution_copy)
+            if candidates is not None:
+                for perms in self._ordered_perms():
+                    candidates.append_perms(perms)
             
-            if len(self.solutions_found) % 100 == 0:
-                elapsed = time.time() - self.search_start_time
-                print(f"\r  Lösungen gefunden: {len(self.solutions_found):,} ({elapsed:.1f}s)", end='', flush=True)
+            if show_progress and count % 100 < weight:
+                now = time.time()
+                elapsed = now - self.search_start_time
+                self._log(f"\r  Lösungen gefunden: {count:,} ({elapsed:.1f}s)", end='', flush=True)
+                if self.progress is not None:
+                    level_elapsed = now - self._level_start_time
+                    self._emit('solutions', level=max_overlap, solutions=count,
+                               nodes=self.total_nodes_explored,
+                               nodes_per_sec=self.total_nodes_explored / level_elapsed if level_elapsed > 0 else 0.0,
+                               time_elapsed=elapsed)
             
             # Abbruch nach dieser Lösung prüfen
-            if len(self.solutions_found) >= self.max_solutions:
-                print(f"\n  ✓ Limit von {self.max_solutions:,} Lösungen erreicht, stoppe Suche")
-            
-            return
+            if count >= allowance:
+                granted = claim(held) if claim is not None else 0
+                held = granted
+                if not granted:
+                    if show_progress:
+                        self._log(f"\n  ✓ Limit von {self.max_solutions:,} Lösungen erreicht, stoppe Suche")
+                    limit_reached = True
+                    break
+                allowance += granted
         
-        # Generiere Permutationen für diese Runde
-        self._generate_round_permutations(assignment, round_idx, current_overlap, max_overlap)
+        if release is not None:
+            release(held, max(0, allowance - count))
+        
+        return self._reduction_result(count, best_score, best_count, chosen, histogram, candidates,
+                                      pool, limit_reached)
+    
+    @staticmethod
+    def _reduction_result(count: int, best_score: float, best_count: int,
+                          chosen: Optional[List[List[int]]], histogram: Dict[int, int],
+                          candidates: Optional[PackedAssignments],
+                          samples: Optional[List[List[List[int]]]] = None,
+                          limit_reached: bool = False) -> Dict:
+        return {
+            'limit_reached': limit_reached,
+            'count': count,
+            'best_score': best_score,
+            'best_count': best_count,
+            'chosen': chosen,
+            'histogram': histogram,
+            'candidates': candidates,
+            'samples': samples if samples is not None else ([chosen] if chosen else [])
+        }
     
-    def _generate_round_permutations(self, assignment: Dict[str, List[str]], 
-                                     round_idx: int, current_overlap: int, max_overlap: int):
+    def _reduce_solutions_parallel(self, executor: ProcessPoolExecutor, max_overlap: int,
+                                   workers: int, samples: int = 1) -> Dict:
         """
-        Generiert Permutationen mit optimiertem Pruning.
+        Wie _reduce_solutions, aber über unabhängige Teilbäume (Präfixe von Runde 0)
+        verteilt. Die Teilergebnisse werden zusammengeführt; die Auswahl unter den
+        besten Kandidaten wird nach deren Anzahl pro Teilbaum gewichtet und bleibt
+        damit gleichverteilt. Mit samples > 1 zieht jeder Teilbaum seine eigene
+        Stichprobe, die anschließend ebenfalls gewichtet gemischt werden
+        (_merge_samples).
         """
-        receivers_used = set()
-        givers = self.participants.copy()
+        prefixes = self._split_prefixes(max_overlap, min_tasks=8 * workers)
+        futures = [executor.submit(_solve_subtree, self, max_overlap, prefix,
+                                   random.getrandbits(64), samples)
+                   for prefix in prefixes]
+        
+        count = 0
+        best_score = float('inf')
+        best_count = 0
+        histogram = defaultdict(int)
+        best_parts = []
+        limit_reached = False
+        nodes = 0
+        pruned = [0, 0, 0]
+        tt = [0, 0, 0]
+        for future in futures:
+            part = future.result()
+            if part['budget_exhausted']:
+                self.budget_exhausted = True
+            count += part['count']
+            limit_reached = limit_reached or part['limit_reached']
+            nodes += part['nodes']
+            pruned = [a + b for a, b in zip(pruned, part['pruned'])]
+            tt = [a + b for a, b in zip(tt, part['tt'])]
+            for score, c in part['histogram'].items():
+                histogram[score] += c
+            if not part['count']:
+                continue
+            if part['best_score'] < best_score:
+                best_score = part['best_score']
+                best_count = 0
+                best_parts = []
+            if part['best_score'] == best_score:
+                best_count += part['best_count']
+                best_parts.append(part)
+        
+        self.total_nodes_explored = nodes
+        self.pruned_overlap, self.pruned_bound, self.pruned_matching = pruned
+        self.tt_hits, self.tt_misses, self.tt_evictions = tt
+        
+        chosen = None
+        pool = None
+        if best_parts:
+            weights = [part['best_count'] for part in best_parts]
+            chosen = random.choices(best_parts, weights=weights)[0]['chosen']
+            if samples > 1:
+                pool = self._merge_samples(best_parts, samples)
+        if limit_reached:
+            self._log(f"\n  ✓ Limit von {self.max_solutions:,} Lösungen erreicht, stoppe Suche")
         
-        self._permute_receivers(assignment, round_idx, givers, 0, receivers_used, 
-                               current_overlap, max_overlap)
+        return self._reduction_result(count, best_score, best_count, chosen, histogram, None,
+                                      pool, limit_reached)
     
-    def _permute_receivers(self, assignment: Dict[str, List[str]], round_idx: int,
-                          givers: List[str], giver_idx: int, receivers_used: Set[str],
-                          current_overlap: int, max_overlap: int):
+    def _merge_samples(self, parts: List[Dict], samples: int) -> List[List[List[int]]]:
         """
-        Rekursives Permutieren mit erweiterten Pruning-Strategien.
+        Führt die Stichproben mehrerer Teilbäume zu einer gleichverteilten
+        Stichprobe (ohne Zurücklegen) von bis zu `samples` Lösungen über alle
+        Teilbäume zusammen. Jede Teilstichprobe ist eine gleichverteilte Auswahl
+        von min(samples, Anzahl) der besten Lösungen ihres Teilbaums; gezogen
+        wird daher wiederholt ein Teilbaum mit Wahrscheinlichkeit proportional
+        zu seinen noch nicht gezogenen Lösungen und daraus das nächste Element.
         """
-        # Abbruch, wenn wir genug Lösungen haben
-        if len(self.solutions_found) >= self.max_solutions:
-            return
+        remaining = [part['best_count'] // self._orderings for part in parts]
+        pools = []
+        for part in parts:
+            pool = list(part['samples'])
+            random.shuffle(pool)
+            pools.append(pool)
+        merged = []
+        while len(merged) < samples and any(remaining):
+            i = random.choices(range(len(parts)), weights=remaining)[0]
+            remaining[i] -= 1
+            merged.append(pools[i].pop())
+        return merged
+    
+    def _split_prefixes(self, max_overlap: int, min_tasks: int) -> List[Tuple[int, ...]]:
+        """
+        Zerlegt den Suchbaum an den ersten Givern von Runde 0: Vertieft die Präfixe
+        (Empfänger von Giver 0, 1, ...), bis mindestens `min_tasks` Teilbäume
+        existieren. Unzulässige Präfixe werden erst im Worker verworfen; der letzte
+        Giver einer Runde wird nie fixiert.
+        """
+        prefixes = [()]
+        for depth in range(self.n - 1):
+            if len(prefixes) >= min_tasks:
+                break
+            extended = []
+            for prefix in prefixes:
+                used = 0
+                for r in prefix:
+                    used |= 1 << r
+                overlap = sum(self._penalty[g][r] for g, r in enumerate(prefix))
+                options = self._allowed[depth] & ~used
+                while options:
+                    bit = options & -options
+                    options ^= bit
+                    receiver = bit.bit_length() - 1
+                    if overlap + self._penalty[depth][receiver] <= max_overlap:
+                        extended.append(prefix + (receiver,))
+            prefixes = extended
+        return prefixes
+    
+    def solve_min_cost(self) -> Optional[Dict]:
+        """
+        Min-Cost-Modus: Bestimmt die optimale Zuordnung direkt in Polynomialzeit,
+        ohne Iterative Deepening.
         
-        self.total_nodes_explored += 1
+        Alle Runden zusammen bilden einen `rounds`-regulären bipartiten Graphen ohne
+        Selbstkanten. Dieser wird als Min-Cost-Flow (Giver -> Empfänger, Kapazität 1)
+        berechnet: Kanten aus Liste 1 kosten W = n * rounds + 1, Kanten aus Liste 2
+        kosten 1. Damit ist das Ergebnis lexikographisch optimal (erst Liste 1, dann
+        Liste 2). Mit `history` werden direkt die Strafgewichte verwendet.
+        Anschließend wird der Graph nach König in `rounds` perfekte Matchings
+        (= Runden) zerlegt.
         
-        # DEBUG: Zeige ersten paar Knoten NUR in Runde 0
-        if self.total_nodes_explored <= 20 and round_idx == 0:
-            print(f"\n  DEBUG Node {self.total_nodes_explored}:")
-            print(f"    Round: {round_idx}, Giver_idx: {giver_idx}/{len(givers)}")
-            print(f"    Current_overlap: {current_overlap}, Max: {max_overlap}")
-            print(f"    Receivers_used: {receivers_used}")
-        
-        if giver_idx == len(givers):
-            # Runde komplett - weiter zur nächsten
-            if self.total_nodes_explored <= 20 and round_idx == 0:
-                print(f"    -> Runde {round_idx} komplett, gehe zu Runde {round_idx + 1}")
-            self._backtrack_rounds(assignment, round_idx + 1, current_overlap, max_overlap)
-            return
+        Ausschlüsse und Paare aus `constraints` fehlen im Flow-Netz. Die Regel
+        no_reciprocal lässt sich so nicht ausdrücken: Verletzt die Zerlegung sie,
+        wird None zurückgegeben (dann solve() verwenden).
+        """
+        start_time = time.time()
+        n = self.n
+        
+        self._log(f"{'='*70}")
+        self._log(f"MIN-COST-ZUORDNUNG (MIN-COST-FLOW)")
+        self._log(f"{'='*70}")
+        self._log(f"Teilnehmer: {n}, Runden: {self.rounds}\n")
+        
+        weight_liste1 = n * self.rounds + 1
+        flow_result = self._min_cost_rounds(self._flow_cost_matrix())
+        if flow_result is None:
+            self._log(f"❌ Keine gültige Lösung möglich!")
+            return None
+        total_cost, perms = flow_result
+        if self._violates_reciprocity(perms):
+            self._log(f"❌ Min-Cost-Lösung verletzt die Regel no_reciprocal, bitte solve() verwenden")
+            return None
+        assignment = self._assignment_from_perms(perms)
+        elapsed = time.time() - start_time
+        
+        if self.history:
+            overlaps_per_year = [count_overlaps(assignment, liste) for liste in self.history]
+            self._log(f"📊 ERGEBNISSE (optimal):")
+            self._log(f"   Score (gewichtete Historie): {total_cost}")
+            self._log(f"   Überschneidungen pro Jahr: {overlaps_per_year}")
+            self._log(f"   Zeit: {elapsed:.2f}s")
+            return {
+                'assignment': assignment,
+                'score': total_cost,
+                'overlaps_per_year': overlaps_per_year,
+                'optimal': True,
+                'time_elapsed': elapsed
+            }
+        
+        overlap_liste1, overlap_liste2 = divmod(total_cost, weight_liste1)
+        
+        self._log(f"📊 ERGEBNISSE (optimal):")
+        self._log(f"   Überschneidungen mit Liste 1: {overlap_liste1}")
+        if self.liste2:
+            self._log(f"   Überschneidungen mit Liste 2: {overlap_liste2}")
+        self._log(f"   Zeit: {elapsed:.2f}s")
+        
+        result = {
+            'assignment': assignment,
+            'overlap_liste1': overlap_liste1,
+            'optimal': True,
+            'time_elapsed': elapsed
+        }
+        if self.liste2:
+            result['overlap_liste2'] = overlap_liste2
+        return result
+    
+    def _violates_reciprocity(self, perms: List[List[int]]) -> bool:
+        """Ob Runden-Permutationen die Regel no_reciprocal verletzen (ohne Regel nie)."""
+        return self._no_reciprocal and any(has_reciprocal(perm) for perm in perms)
+    
+    def _flow_cost_matrix(self) -> List[List[int]]:
+        """Kantenkosten des Min-Cost-Flows: Strafmatrix bzw. W * Liste 1 + Liste 2."""
+        if self.history:
+            return self._penalty
+        weight_liste1 = self.n * self.rounds + 1
+        return [[weight_liste1 * (m1 >> r & 1) + (m2 >> r & 1) for r in range(self.n)]
+                for m1, m2 in zip(self._liste1_masks, self._liste2_masks)]
+    
+    def _min_cost_rounds(self, cost: List[List[int]], deadline: float = float('inf')
+                         ) -> Optional[Tuple[int, List[List[int]]]]:
+        """
+        Min-Cost-Flow über alle Runden für die Kostenmatrix cost[g][r] und
+        Zerlegung in Runden-Permutationen. Gibt (Gesamtkosten, Permutationen)
+        zurück oder None, falls keine gültige Zuordnung existiert. Nach
+        `deadline` wird mit TimeoutError abgebrochen (siehe _min_cost_flow).
+        """
+        n = self.n
+        if self.rounds > n - 1:
+            return None
+        
+        # Knoten: 0 = Quelle, 1..n = Giver, n+1..2n = Empfänger, 2n+1 = Senke
+        source, sink = 0, 2 * n + 1
+        arcs = []
+        pair_of_arc = []
+        givers = list(range(n))
+        random.shuffle(givers)  # Zufällige Wahl unter gleich guten Lösungen
+        for g in givers:
+            receivers = list(range(n))
+            random.shuffle(receivers)
+            for r in receivers:
+                if not self._allowed[g] >> r & 1:
+                    continue
+                pair_of_arc.append((g, r))
+                arcs.append((1 + g, 1 + n + r, 1, cost[g][r]))
+        for i in range(n):
+            arcs.append((source, 1 + i, self.rounds, 0))
+            arcs.append((1 + n + i, sink, self.rounds, 0))
+        
+        flow_result = _min_cost_flow(2 * n + 2, arcs, source, sink, n * self.rounds, deadline)
+        if flow_result is None:
+            return None
+        total_cost, flows = flow_result
+        
+        adjacency = [set() for _ in range(n)]
+        for (g, r), f in zip(pair_of_arc, flows):
+            if f:
+                adjacency[g].add(r)
+        
+        return total_cost, _split_regular_graph(adjacency, self.rounds)
+    
+    def repair(self, previous_assignment: Dict[str, List[str]],
+               added: Optional[List[str]] = None,
+               removed: Optional[List[str]] = None) -> Optional[Dict]:
+        """
+        Repariert eine bestehende Zuordnung, wenn Teilnehmer dazukommen oder absagen,
+        statt alles neu zu mischen.
         
-        giver = givers[giver_idx]
-        already_received = set(assignment[giver])  # Optimierung: Set für O(1) lookup
+        Der Solver muss mit der neuen Teilnehmerliste erstellt sein (vorher - removed
+        + added). Jede Runde wird als Min-Cost-Perfect-Matching (Ungarische Methode)
+        gelöst: Bestehende Kanten der Runde kosten 0, jede neue Kante kostet W;
+        eine neue Kante, die in einer späteren Runde schon existiert, kostet 2W, weil
+        sie dort einen weiteren Wechsel erzwingt. Zusätzlich kostet jede Kante ihre
+        Strafe aus Liste 1 bzw. der Historie (W ist größer als jede Rundensumme).
+        Unberührte Zyklen bleiben damit erhalten, nur die durch Zu- und Abgänge
+        aufgebrochenen Zyklen werden neu geschlossen. Bereits reparierte Runden
+        sperren ihre Kanten für spätere Runden; der Restgraph bleibt regulär, daher
+        existiert jede Runde immer (ohne constraints).
         
-        # Vorberechnung für Constraint Propagation
-        available_receivers = []
-        for receiver in self.participants:
-            # Basis-Constraints
-            if receiver == giver or receiver in already_received or receiver in receivers_used:
+        Verbotene Kanten aus `constraints` werden wie Selbstkanten gesperrt. Enthält
+        eine Runde mit no_reciprocal ein gegenseitiges Paar, wird dessen neue (bzw.
+        erste) Kante für diese Runde gesperrt und die Runde erneut gelöst, höchstens
+        n-mal.
+        """
+        start_time = time.time()
+        added = added or []
+        removed = removed or []
+        n = self.n
+        
+        expected = (set(previous_assignment) - set(removed)) | set(added)
+        if expected != set(self.participants):
+            raise ValueError("Teilnehmer des Solvers passen nicht zu vorheriger Zuordnung "
+                             "+ added - removed")
+        if self.rounds > n - 1:
+            self._log(f"❌ Keine gültige Lösung möglich!")
+            return None
+        
+        # Bisherige Kanten je Runde als Index-Paare (entfernte Personen fallen weg)
+        previous_edges = [set() for _ in range(self.rounds)]
+        for giver, receivers in previous_assignment.items():
+            g = self._index.get(giver)
+            if g is None:
                 continue
-            available_receivers.append(receiver)
+            for round_idx, receiver in enumerate(receivers[:self.rounds]):
+                r = self._index.get(receiver)
+                if r is not None:
+                    previous_edges[round_idx].add((g, r))
+        
+        change_cost = n * max(max(row) for row in self._penalty) + 1
+        forbidden = 4 * change_cost * n
+        used_edges = set()
+        perms = []
+        changed = 0
+        
+        for round_idx in range(self.rounds):
+            later_edges = set().union(*previous_edges[round_idx + 1:])
+            cost = [[0] * n for _ in range(n)]
+            for g in range(n):
+                penalty_row = self._penalty[g]
+                allowed = self._allowed[g]
+                row = cost[g]
+                for r in range(n):
+                    if not allowed >> r & 1 or (g, r) in used_edges:
+                        row[r] = forbidden
+                    elif (g, r) in previous_edges[round_idx]:
+                        row[r] = 0
+                    else:
+                        row[r] = change_cost * (2 if (g, r) in later_edges else 1)
+                    row[r] += penalty_row[r]
+            
+            perm = _hungarian(cost)
+            for _ in range(n if self._no_reciprocal else 0):
+                pairs = [(g, r) for g, r in enumerate(perm) if g < r and perm[r] == g]
+                if not pairs:
+                    break
+                for g, r in pairs:
+                    if (g, r) in previous_edges[round_idx]:
+                        g, r = r, g
+                    cost[g][r] = forbidden
+                perm = _hungarian(cost)
+            if self._violates_reciprocity([perm]):
+                self._log(f"❌ Keine Runde ohne gegenseitiges Beschenken gefunden!")
+                return None
+            for g, r in enumerate(perm):
+                if cost[g][r] >= forbidden:
+                    self._log(f"❌ Keine gültige Lösung möglich!")
+                    return None
+                if (g, r) not in previous_edges[round_idx]:
+                    changed += 1
+                used_edges.add((g, r))
+            perms.append(perm)
+        
+        assignment = self._assignment_from_perms(perms)
+        elapsed = time.time() - start_time
+        overlap_liste1 = count_overlaps(assignment, self.liste1)
+        
+        self._log(f"🔧 REPARATUR: {len(added)} neu, {len(removed)} abgesagt")
+        self._log(f"   Geänderte Zuordnungen: {changed} von {n * self.rounds}")
+        self._log(f"   Überschneidungen mit Liste 1: {overlap_liste1}")
+        self._log(f"   Zeit: {elapsed:.2f}s")
         
-        if self.total_nodes_explored <= 20 and round_idx == 0:
-            print(f"    Giver: {giver}, Available receivers: {available_receivers}")
+        result = {
+            'assignment': assignment,
+            'changed_edges': changed,
+            'kept_edges': n * self.rounds - changed,
+            'overlap_liste1': overlap_liste1,
+            'time_elapsed': elapsed
+        }
+        if self.liste2:
+            result['overlap_liste2'] = count_overlaps(assignment, self.liste2)
+        return result
+    
+    def count_solutions(self, max_overlap: int) -> List[int]:
+        """
+        Exakte Anzahl gültiger (geordneter) Zuordnungen je Overlap-Level, ohne
+        sie aufzuzählen.
+        
+        Dynamische Programmierung Giver für Giver: Zustand ist das Tupel der in
+        jeder Runde bereits vergebenen Empfänger (Bitmasken), jeder Giver wählt
+        seine Empfänger aller Runden auf einmal (paarweise verschieden). Da die
+        Runden vertauschbar sind, hängt die Zahl der Vervollständigungen nicht
+        von der Reihenfolge der Masken ab; das Tupel wird sortiert gespeichert
+        (bis zu rounds! weniger Zustände). Jeder Zustand liefert einen
+        Zählvektor über die noch hinzukommende Strafe bis max_overlap.
+        
+        Die Zustandszahl wächst mit C(n, n/2)^rounds / rounds!; gedacht für
+        kleine Gruppen (etwa n <= 9 bei 3 Runden), dort aber um Größenordnungen
+        schneller als die Aufzählung. Die Tabelle bleibt für sample_solutions
+        erhalten.
+        
+        Returns:
+            counts[x] = Anzahl Zuordnungen mit Overlap (bzw. Score) genau x,
+            für x = 0..max_overlap
+        """
+        if self._no_reciprocal:
+            raise ValueError("count_solutions unterstützt die Regel no_reciprocal nicht")
+        if self._count_table is None or self._count_table[0] < max_overlap:
+            self._count_table = (max_overlap, {})
+        limit, memo = self._count_table
+        return self._completions(0, (0,) * self.rounds, limit, memo)[:max_overlap + 1]
+    
+    def sample_solutions(self, overlap: int, k: int = 1) -> List[Dict[str, List[str]]]:
+        """
+        Zieht `k` unabhängige, exakt gleichverteilte Zuordnungen mit Overlap
+        (bzw. Score) genau `overlap` anhand der Zähltabelle von count_solutions:
+        Jeder Giver wählt seine Empfänger mit Wahrscheinlichkeit proportional zur
+        Zahl der passenden Vervollständigungen. Leere Liste, falls es keine gibt.
+        """
+        if self.count_solutions(overlap)[overlap] == 0:
+            return []
+        limit, memo = self._count_table
+        samples = []
+        for _ in range(k):
+            masks = (0,) * self.rounds
+            perms = [[0] * self.n for _ in range(self.rounds)]
+            remaining = overlap
+            for giver in range(self.n):
+                options = []
+                total = 0
+                for picks, new_masks, cost in self._giver_options(giver, masks, remaining):
+                    ways = self._completions(giver + 1, tuple(sorted(new_masks)), limit, memo)[remaining - cost]
+                    if ways:
+                        options.append((ways, picks, new_masks, cost))
+                        total += ways
+                target = random.randrange(total)
+                for ways, picks, new_masks, cost in options:
+                    if target < ways:
+                        break
+                    target -= ways
+                for perm, bit in zip(perms, picks):
+                    perm[giver] = bit.bit_length() - 1
+                masks = new_masks
+                remaining -= cost
+            samples.append(self._assignment_from_perms(perms))
+        return samples
+    
+    def _completions(self, giver: int, masks: Tuple[int, ...], limit: int,
+                     memo: Dict[Tuple[int, Tuple[int, ...]], List[int]]) -> List[int]:
+        """Zählvektor der Vervollständigungen ab `giver` (Index = zusätzliche Strafe)."""
+        if giver == self.n:
+            return [1] + [0] * limit
+        key = (giver, masks)
+        counts = memo.get(key)
+        if counts is not None:
+            return counts
+        counts = [0] * (limit + 1)
+        for _, new_masks, cost in self._giver_options(giver, masks, limit):
+            sub = self._completions(giver + 1, tuple(sorted(new_masks)), limit, memo)
+            for extra in range(limit - cost + 1):
+                if sub[extra]:
+                    counts[cost + extra] += sub[extra]
+        memo[key] = counts
+        return counts
+    
+    def _giver_options(self, giver: int, masks: Tuple[int, ...],
+                       budget: int) -> Iterator[Tuple[Tuple[int, ...], Tuple[int, ...], int]]:
+        """
+        Alle Empfänger-Tupel (ein Bit pro Runde, paarweise verschieden) von `giver`
+        bei vergebenen Empfängern `masks` mit Strafe <= budget, jeweils als
+        (picks, neue masks, Strafe).
+        """
+        allowed = self._allowed[giver]
+        row = self._penalty[giver]
+        rounds = self.rounds
+        stack = [(0, (), 0, 0)]
+        while stack:
+            k, picks, picked, cost = stack.pop()
+            if k == rounds:
+                yield picks, tuple(m | b for m, b in zip(masks, picks)), cost
+                continue
+            options = allowed & ~masks[k] & ~picked
+            while options:
+                bit = options & -options
+                options ^= bit
+                c = cost + row[bit.bit_length() - 1]
+                if c <= budget:
+                    stack.append((k + 1, picks + (bit,), picked | bit, c))
+    
+    def iter_solutions(self, max_overlap: int,
+                       expand_rounds: bool = False) -> Iterator[Dict[str, List[str]]]:
+        """
+        Generator über alle gültigen Zuordnungen mit höchstens `max_overlap`
+        Überschneidungen zu Liste 1. Jede Lösung wird erst beim Ausgeben in ein
+        Namens-Dictionary übersetzt; es wird nichts zwischengespeichert.
         
-        # Constraint Propagation: Prüfe ob verbleibende Giver noch genug Optionen haben
-        if not self._check_feasibility(assignment, round_idx, giver_idx, givers, receivers_used):
-            self.total_branches_pruned += 1
-            if self.total_nodes_explored <= 20 and round_idx == 0:
-                print(f"    -> PRUNED (feasibility)")
+        Args:
+            expand_rounds: Bei Symmetriebrechung jede kanonische Lösung in alle
+                rounds! Rundenreihenfolgen expandieren
+        """
+        for _ in self._search(max_overlap):
+            if expand_rounds:
+                yield from self._ordered_assignments()
+            else:
+                yield self._assignment_from_perms()
+    
+    def _ordered_perms(self) -> Iterator[List[List[int]]]:
+        """Runden-Permutationen aller geordneten Zuordnungen, für die die aktuelle Lösung steht."""
+        if not self.symmetry_breaking:
+            yield self._round_perms
+            return
+        for order in itertools.permutations(self._round_perms):
+            yield list(order)
+    
+    def _ordered_assignments(self) -> Iterator[Dict[str, List[str]]]:
+        """Alle geordneten Zuordnungen, für die die aktuelle Lösung steht."""
+        for perms in self._ordered_perms():
+            yield self._assignment_from_perms(perms)
+    
+    def _assignment_from_perms(self, perms: Optional[List[List[int]]] = None) -> Dict[str, List[str]]:
+        """Übersetzt Runden-Permutationen (Standard: die aktuellen) zurück in Namen."""
+        if perms is None:
+            perms = self._round_perms
+        names = self.participants
+        return {names[g]: [names[perm[g]] for perm in perms]
+                for g in range(self.n)}
+    
+    def _search(self, max_overlap: int, prefix: Tuple[int, ...] = ()) -> Iterator[int]:
+        """
+        Backtracking über alle Runden mit Overlap-Limit als iterative Tiefensuche.
+        
+        Liefert bei jeder vollständigen Lösung deren Overlap zu Liste 1. Die Lösung
+        selbst steht zu diesem Zeitpunkt in self._round_perms / self._received und
+        ist nur bis zum nächsten Schritt des Generators gültig.
+        
+        Giver werden je Runde in Teilnehmer-Reihenfolge belegt, Empfänger als
+        Bitmasken (niedrigstes Bit zuerst) probiert; mit ordering='mrv' bestimmt
+        stattdessen _choose_giver beide Reihenfolgen. Mit Symmetriebrechung sind nur
+        lexikographisch aufsteigende Runden erlaubt; da kein Giver jemanden doppelt
+        beschenkt, reicht dafür ein aufsteigender Empfänger von Teilnehmer 0.
+        
+        Jeder Stack-Frame hält ein perfektes Matching der noch offenen Giver auf die
+        noch freien Empfänger; es wird pro Kind inkrementell repariert, sodass jeder
+        betretene Knoten garantiert zu einer vollständigen Runde führt (mit
+        no_reciprocal nur noch notwendig: Gegenseitigkeit wird erst beim Belegen
+        einer Kante gegen die Kanten der laufenden Runde geprüft, ein Bittest).
+        
+        Mit Transpositionstabelle wird jeder Knoten über (Kanten früherer Runden,
+        Kanten der aktuellen Runde, Maske von Teilnehmer 0) identifiziert; das legt
+        den restlichen Suchbaum eindeutig fest. Bleibt ein Teilbaum ohne Lösung,
+        wird sein Rest-Budget gespeichert und jeder spätere Knoten mit demselben
+        Zustand und höchstens diesem Budget übersprungen.
+        
+        `prefix` fixiert die Empfänger der ersten Giver von Runde 0; durchsucht
+        wird dann nur der Teilbaum darunter.
+        
+        Untere Schranke (lower_bound): Vor dem Absteigen wird zum Overlap addiert,
+        was die restlichen Giver mindestens noch kosten, und der Zweig verworfen,
+        falls das Limit überschritten wird. Beide Anteile sind zulässig (unterschätzen
+        nie), die Zählungen bleiben also exakt:
+        - Spätere Runden (_future_bound): Braucht ein Giver nach dieser Runde noch k
+          Empfänger, hat aber nur z straffreie übrig, kostet er mindestens die k - z
+          kleinsten Strafen. Die Summe wird pro Frame inkrementell mitgeführt.
+        - Aktuelle Runde (_round_bound): Jeder noch offene Giver, dessen freie
+          Empfänger alle strafbehaftet sind, kostet mindestens seine kleinste dieser
+          Strafen. Wird pro Frame einmal berechnet, der Test pro Kandidat ist O(1).
+        """
+        n = self.n
+        rounds = self.rounds
+        allowed = self._allowed
+        penalty = self._penalty
+        penalty_masks = self._penalty_masks
+        check_feasibility = self._check_feasibility
+        future_bound = self._future_bound
+        round_bound = self._round_bound
+        use_bound = self.lower_bound
+        no_reciprocal = self._no_reciprocal
+        ordered = self.ordering == 'mrv'
+        full_mask = self._full_mask
+        symmetry_breaking = self.symmetry_breaking
+        use_tt = self.transposition_table_size > 0
+        debug = self.debug
+        deadline = self._deadline
+        node_limit = self._node_limit
+        budgeted = deadline != float('inf') or node_limit != float('inf')
+        
+        # received[g]: Bitmaske aller Empfänger, die g bisher zugeordnet sind
+        received = [0] * n
+        perms = [[-1] * n for _ in range(rounds)]
+        self._received = received
+        self._round_perms = perms
+        self.total_nodes_explored = 0
+        self.pruned_overlap = 0
+        self.pruned_bound = 0
+        self.pruned_matching = 0
+        self.tt_hits = 0
+        self.tt_misses = 0
+        self.tt_evictions = 0
+        leaves = 0
+        
+        if rounds == 0:
+            yield 0
             return
         
-        # Versuche jeden verfügbaren Empfänger
-        for receiver in available_receivers:
-            # Pruning: Würde diese Zuordnung das Overlap-Limit überschreiten?
-            would_add_overlap = (giver, receiver) in self.liste1_overlaps
-            new_overlap = current_overlap + (1 if would_add_overlap else 0)
+        # Start-Matching für die erste Runde
+        self._first_giver_mask = self._full_mask
+        matching = self._initial_matching()
+        if matching is None:
+            self.pruned_matching += 1
+            return
+        self.total_nodes_explored += 1
+        
+        # Präfix von Runde 0 fest anwenden
+        used = 0
+        overlap = 0
+        edges = 0
+        for giver, receiver in enumerate(prefix):
+            bit = 1 << receiver
+            if not allowed[giver] & ~used & bit:
+                return
+            if no_reciprocal and edges >> (receiver * n + giver) & 1:
+                return
+            overlap += penalty[giver][receiver]
+            matching = check_feasibility(giver, receiver, used | bit, matching)
+            if overlap > max_overlap:
+                self.pruned_overlap += 1
+                return
+            if matching is None:
+                self.pruned_matching += 1
+                return
+            used |= bit
+            edges |= 1 << (giver * n + receiver)
+            perms[0][giver] = receiver
+            received[giver] |= bit
+        
+        # Frames: siehe _new_frame und die _F_*-Konstanten
+        start = len(prefix)
+        unassigned = full_mask & ~((1 << start) - 1)
+        if ordered:
+            start, start_available = self._choose_giver(unassigned, used, full_mask)
+        else:
+            start_available = allowed[start] & ~used
+        start_open = unassigned & ~(1 << start)
+        if use_bound:
+            stack = [_new_frame(0, start, used, overlap, matching, start_available, full_mask,
+                                0, edges, 0, max_overlap - overlap,
+                                future=sum(future_bound(g, rounds - 1) for g in range(n)),
+                                future_own=future_bound(start, rounds - 1),
+                                round_bound=round_bound(start_open, used), open_givers=start_open)]
+        else:
+            stack = [_new_frame(0, start, used, overlap, matching, start_available, full_mask,
+                                0, edges, 0, max_overlap - overlap, open_givers=start_open)]
+        
+        while stack:
+            frame = stack[-1]
+            # Slots _F_ROUND bis _F_FIRST_MASK
+            round_idx, giver, used, overlap, matching, available, assigned_bit, first_mask = frame[:8]
+            if assigned_bit:
+                # Backtrack: vorherigen Empfänger dieses Givers zurücknehmen
+                received[giver] ^= assigned_bit
+                frame[_F_ASSIGNED] = 0
+            self._first_giver_mask = first_mask
             
-            if self.total_nodes_explored <= 20 and round_idx == 0:
-                print(f"    Trying {giver} -> {receiver}: would_overlap={would_add_overlap}, new_overlap={new_overlap}")
+            # Nächsten zulässigen Empfänger suchen
+            penalty_row = penalty[giver]
+            penalty_mask = penalty_masks[giver]
+            if use_bound:
+                picks_left = rounds - round_idx - 1
+                future_others = frame[_F_FUTURE] - frame[_F_FUTURE_OWN]
+                round_stuck, round_critical = frame[_F_ROUND_BOUND]
+                # Straffreie Empfänger, die giver nach dieser Runde noch fehlen würden
+                missing = picks_left - (allowed[giver] & ~received[giver] & ~penalty_mask).bit_count()
+            child_future = frame[_F_FUTURE]
+            child_matching = None
+            while available:
+                if ordered:
+                    bit = available.pop()
+                else:
+                    bit = available & -available
+                    available ^= bit
+                receiver = bit.bit_length() - 1
+                
+                # Gegenseitiges Beschenken in derselben Runde (Regel no_reciprocal)
+                if no_reciprocal and frame[_F_ROUND_EDGES] >> (receiver * n + giver) & 1:
+                    continue
+                
+                # Pruning: Würde diese Zuordnung das Overlap-Limit überschreiten?
+                if penalty_mask & bit:
+                    new_overlap = overlap + penalty_row[receiver]
+                    if new_overlap > max_overlap:
+                        self.pruned_overlap += 1
+                        continue
+                else:
+                    new_overlap = overlap
+                
+                # Untere Schranke für die restlichen Giver
+                if use_bound:
+                    if missing + (0 if penalty_mask & bit else 1) > 0:
+                        received[giver] |= bit
+                        child_future = future_others + future_bound(giver, picks_left)
+                        received[giver] ^= bit
+                    else:
+                        child_future = future_others
+                    if new_overlap + child_future + round_stuck + round_critical.get(bit, 0) > max_overlap:
+                        self.pruned_bound += 1
+                        continue
+                
+                # Constraint Propagation: Lässt sich die Runde nach giver -> receiver
+                # noch zu einem perfekten Matching vervollständigen?
+                child_matching = check_feasibility(giver, receiver, used | bit, matching)
+                if child_matching is None:
+                    self.pruned_matching += 1
+                    continue
+                break
             
-            if new_overlap > max_overlap:
-                self.total_branches_pruned += 1
-                if self.total_nodes_explored <= 20 and round_idx == 0:
-                    print(f"      -> PRUNED (overlap limit)")
+            frame[_F_AVAILABLE] = available
+            if child_matching is None:
+                stack.pop()
+                if use_tt and frame[_F_LEAVES] == leaves:
+                    self._store_dead_state((frame[_F_PREV_EDGES], frame[_F_ROUND_EDGES], first_mask),
+                                           frame[_F_BUDGET])
                 continue
             
             # Zuordnung hinzufügen
-            assignment[giver].append(receiver)
-            receivers_used.add(receiver)
+            frame[_F_ASSIGNED] = bit
+            perms[round_idx][giver] = receiver
+            received[giver] |= bit
+            self.total_nodes_explored += 1
             
-            if self.total_nodes_explored <= 20 and round_idx == 0:
-                print(f"      -> Assigned, recurse...")
+            # Anytime-Budget: Knoten exakt, Zeit alle 1024 Knoten prüfen
+            if budgeted and (self.total_nodes_explored >= node_limit or
+                             not self.total_nodes_explored & 1023 and time.time() >= deadline):
+                self.budget_exhausted = True
+                return
             
-            # Rekursiv weiter
-            self._permute_receivers(assignment, round_idx, givers, giver_idx + 1, 
-                                   receivers_used, new_overlap, max_overlap)
+            if debug and self.total_nodes_explored <= 20:
+                self._log(f"\n  DEBUG Node {self.total_nodes_explored}: Runde {round_idx}, "
+                          f"{self.participants[giver]} -> {self.participants[receiver]}, "
+                          f"Overlap {new_overlap}/{max_overlap}")
             
-            # Backtrack
-            assignment[giver].pop()
-            receivers_used.remove(receiver)
+            prev_edges = frame[_F_PREV_EDGES]
+            round_edges = frame[_F_ROUND_EDGES] | 1 << (giver * n + receiver)
+            budget = max_overlap - new_overlap
+            open_givers = frame[_F_OPEN]
+            
+            if open_givers:
+                if use_tt and self._is_dead_state((prev_edges, round_edges, first_mask), budget):
+                    continue
+                child_used = used | bit
+                if ordered:
+                    next_giver, next_available = self._choose_giver(open_givers, child_used, first_mask)
+                else:
+                    next_giver = giver + 1
+                    next_available = allowed[next_giver] & ~received[next_giver] & ~child_used
+                next_open = open_givers & ~(1 << next_giver)
+                if use_bound:
+                    stack.append(_new_frame(
+                        round_idx, next_giver, child_used, new_overlap, child_matching,
+                        next_available, first_mask, prev_edges, round_edges, leaves, budget,
+                        future=child_future, future_own=future_bound(next_giver, picks_left),
+                        round_bound=round_bound(next_open, child_used), open_givers=next_open))
+                else:
+                    stack.append(_new_frame(
+                        round_idx, next_giver, child_used, new_overlap, child_matching,
+                        next_available, first_mask, prev_edges, round_edges, leaves, budget,
+                        open_givers=next_open))
+            elif round_idx + 1 < rounds:
+                # Runde komplett - weiter zur nächsten
+                if symmetry_breaking:
+                    next_first_mask = full_mask & ~((2 << perms[round_idx][0]) - 1)
+                else:
+                    next_first_mask = full_mask
+                prev_edges |= round_edges
+                if use_tt and self._is_dead_state((prev_edges, 0, next_first_mask), budget):
+                    continue
+                self._first_giver_mask = next_first_mask
+                next_matching = self._initial_matching()
+                if next_matching is None:
+                    self.pruned_matching += 1
+                    continue
+                if ordered:
+                    next_giver, next_available = self._choose_giver(full_mask, 0, next_first_mask)
+                else:
+                    next_giver = 0
+                    next_available = allowed[0] & ~received[0] & next_first_mask
+                next_open = full_mask & ~(1 << next_giver)
+                if use_bound:
+                    next_future = [future_bound(g, picks_left - 1) for g in range(n)]
+                    next_total = sum(next_future)
+                    if new_overlap + next_total > max_overlap:
+                        self.pruned_bound += 1
+                        continue
+                    stack.append(_new_frame(
+                        round_idx + 1, next_giver, 0, new_overlap, next_matching, next_available,
+                        next_first_mask, prev_edges, 0, leaves, budget,
+                        future=next_total, future_own=next_future[next_giver],
+                        round_bound=round_bound(next_open, 0), open_givers=next_open))
+                else:
+                    stack.append(_new_frame(
+                        round_idx + 1, next_giver, 0, new_overlap, next_matching, next_available,
+                        next_first_mask, prev_edges, 0, leaves, budget, open_givers=next_open))
+            else:
+                # Lösung gefunden
+                if debug:
+                    self._debug_solution(new_overlap)
+                leaves += 1
+                yield new_overlap
     
-    def _check_feasibility(self, assignment: Dict[str, List[str]], round_idx: int,
-                          current_giver_idx: int, givers: List[str], 
-                          receivers_used: Set[str]) -> bool:
+    def _choose_giver(self, open_givers: int, used: int, first_mask: int) -> Tuple[int, List[int]]:
         """
-        Constraint Propagation: Prüfe ob noch genug Empfänger für verbleibende Giver da sind.
-        Verhindert sinnlose Branches, die später scheitern würden.
+        Variablen- und Werteordnung für ordering='mrv'.
+        
+        Giver: der offene Giver mit den wenigsten noch möglichen Empfängern
+        (Minimum Remaining Values, bei Gleichstand der kleinste Index).
+        Empfänger: zuerst straffreie bzw. niedrig bestrafte, darunter die, die von
+        den wenigsten anderen offenen Givern noch gebraucht werden (Least
+        Constraining Value).
+        
+        Returns:
+            (Giver, Empfänger-Bits in umgekehrter Probierreihenfolge)
         """
-        remaining_givers = givers[current_giver_idx + 1:]
-        available_receivers = set(self.participants) - receivers_used
+        received = self._received
+        allowed = self._allowed
+        options_of = {}
+        best_giver = -1
+        best_count = self.n + 1
+        while open_givers:
+            giver_bit = open_givers & -open_givers
+            open_givers ^= giver_bit
+            giver = giver_bit.bit_length() - 1
+            options = allowed[giver] & ~received[giver] & ~used
+            if giver == 0:
+                options &= first_mask
+            options_of[giver] = options
+            count = options.bit_count()
+            if count < best_count:
+                best_giver, best_count = giver, count
         
-        # Für jeden verbleibenden Giver prüfen, ob mindestens 1 Option existiert
-        for future_giver in remaining_givers:
-            already_received = set(assignment[future_giver])
-            valid_options = available_receivers - {future_giver} - already_received
-            
-            if not valid_options:
-                # Dieser Giver hätte keine gültige Option mehr
-                return False
+        options = options_of.pop(best_giver)
+        penalty_row = self._penalty[best_giver]
+        candidates = []
+        while options:
+            bit = options & -options
+            options ^= bit
+            demand = sum(1 for other in options_of.values() if other & bit)
+            candidates.append((penalty_row[bit.bit_length() - 1], demand, bit))
+        candidates.sort(reverse=True)
+        return best_giver, [bit for _, _, bit in candidates]
+    
+    def _future_bound(self, giver: int, picks: int) -> int:
+        """
+        Untere Schranke für die Strafen, die `giver` in den `picks` Runden nach der
+        aktuellen noch mindestens erhält: Reichen die straffreien, noch nicht
+        erhaltenen Empfänger nicht aus, fallen die kleinsten übrigen Strafen an.
+        """
+        candidates = self._allowed[giver] & ~self._received[giver]
+        missing = picks - (candidates & ~self._penalty_masks[giver]).bit_count()
+        bound = 0
+        if missing > 0:
+            for cost, bit in self._penalty_order[giver]:
+                if candidates & bit:
+                    bound += cost
+                    missing -= 1
+                    if not missing:
+                        break
+        return bound
+    
+    def _round_bound(self, open_givers: int, used: int) -> Tuple[int, Dict[int, int]]:
+        """
+        Untere Schranke für die noch offenen Giver (Bitmaske) der aktuellen Runde.
+        
+        Returns:
+            (Mindestkosten der Giver ohne straffreien freien Empfänger,
+             Empfänger-Bit -> Zusatzkosten, falls dieses Bit vergeben wird: Summe
+             über die Giver, deren einziger straffreier freier Empfänger es ist)
+        """
+        stuck = 0
+        critical = {}
+        received = self._received
+        zero_allowed = self._zero_allowed
+        while open_givers:
+            giver_bit = open_givers & -open_givers
+            open_givers ^= giver_bit
+            other = giver_bit.bit_length() - 1
+            zero_free = zero_allowed[other] & ~received[other] & ~used
+            if zero_free & (zero_free - 1):
+                continue
+            free = self._allowed[other] & ~received[other] & ~used
+            if not free:
+                continue
+            for cost, option in self._penalty_order[other]:
+                if free & option:
+                    break
+            else:
+                continue
+            if zero_free:
+                critical[zero_free] = critical.get(zero_free, 0) + cost
+            else:
+                stuck += cost
+        return stuck, critical
+    
+    def _is_dead_state(self, key: Tuple[int, int, int], budget: int) -> bool:
+        """Transpositionstabelle: Ist der Zustand unter diesem Rest-Budget bekannt tot?"""
+        dead_budget = self._transposition.get(key)
+        if dead_budget is not None and budget <= dead_budget:
+            self._transposition.move_to_end(key)
+            self.tt_hits += 1
+            return True
+        self.tt_misses += 1
+        return False
+    
+    def _store_dead_state(self, key: Tuple[int, int, int], budget: int):
+        """Transpositionstabelle: Teilbaum hat unter `budget` keine Lösung."""
+        table = self._transposition
+        dead_budget = table.get(key)
+        if dead_budget is not None and dead_budget >= budget:
+            return
+        table[key] = budget
+        table.move_to_end(key)
+        if len(table) > self.transposition_table_size:
+            table.popitem(last=False)
+            self.tt_evictions += 1
+    
+    def _debug_solution(self, current_overlap: int):
+        """DEBUG: Prüft das Overlap-Tracking einer vollständigen Lösung."""
+        actual_overlap = sum(self._penalty[g][perm[g]]
+                             for perm in self._round_perms for g in range(self.n))
+        if actual_overlap != current_overlap:
+            self._log(f"\n  ⚠️  FEHLER: Overlap-Tracking stimmt nicht!")
+            self._log(f"  Getrackt: {current_overlap}, Tatsächlich: {actual_overlap}")
+    
+    def _initial_matching(self) -> Optional[Tuple[List[int], List[int]]]:
+        """
+        Berechnet zu Rundenbeginn ein perfektes Matching aller Giver auf alle
+        Empfänger (Kuhn'sche augmentierende Pfade). None, falls keines existiert.
+        
+        Ein Matching ist ein Paar (Empfänger -> Giver, Giver -> Empfänger) mit -1 für frei.
+        """
+        matching = ([-1] * self.n, [-1] * self.n)
+        for giver in range(self.n):
+            self._visited = 0
+            if not self._augment(giver, matching):
+                return None
+        return matching
+    
+    def _check_feasibility(self, giver: int, receiver: int, blocked: int,
+                          matching: Tuple[List[int], List[int]]
+                          ) -> Optional[Tuple[List[int], List[int]]]:
+        """
+        Constraint Propagation (Satz von Hall): Prüft, ob die restlichen Giver nach
+        giver -> receiver noch perfekt auf die freien Empfänger verteilt werden können.
+        
+        Das Matching des Elternknotens wird inkrementell repariert: War `receiver`
+        dort einem anderen Giver zugeordnet, wird für diesen genau ein augmentierender
+        Pfad gesucht. Gibt das neue Matching zurück oder None, falls die Runde
+        nicht mehr vervollständigt werden kann.
+        """
+        match_of_receiver, match_of_giver = matching
+        previous = match_of_giver[giver]
+        if previous == receiver:
+            # Matching bleibt gültig; es wird nie in-place verändert und darf geteilt werden
+            return matching
         
-        return True
+        child = (match_of_receiver.copy(), match_of_giver.copy())
+        displaced = match_of_receiver[receiver]
+        child[0][receiver] = -1
+        child[0][previous] = -1
+        child[1][giver] = -1
+        child[1][displaced] = -1
+        
+        self._visited = blocked
+        if self._augment(displaced, child):
+            return child
+        
+        # Ein Giver ohne Partner -> nach Hall existiert kein perfektes Matching
+        return None
+    
+    def _augment(self, giver: int, matching: Tuple[List[int], List[int]]) -> bool:
+        """
+        Sucht einen augmentierenden Pfad ab `giver` im Restgraphen
+        (Giver -> noch nicht beschenkte Empfänger außerhalb von self._visited).
+        """
+        match_of_receiver, match_of_giver = matching
+        options = self._allowed[giver] & ~self._received[giver] & ~self._visited
+        if giver == 0:
+            options &= self._first_giver_mask
+        while options:
+            bit = options & -options
+            options ^= bit
+            if self._visited & bit:
+                continue
+            self._visited |= bit
+            receiver = bit.bit_length() - 1
+            other = match_of_receiver[receiver]
+            if other == -1 or self._augment(other, matching):
+                match_of_receiver[receiver] = giver
+                match_of_giver[giver] = receiver
+                return True
+        return False
 
 
 def print_assignments(assignments: Dict[str, List[str]], title: str = "SECRET SANTA ZUORDNUNGEN"):
@@ -357,21 +1967,15 @@ def print_assignments(assignments: Dict[str, List[str]], title: str = "SECRET SA
 def print_comparison(new_list: Dict[str, List[str]], old_list: Dict[str, List[str]], year: str):
     """Zeigt die Überschneidungen zwischen zwei Listen"""
     print(f"\n🔍 Vergleich mit {year}:")
-    overlaps = []
-    for giver in sorted(new_list.keys()):
-        new_receivers = set(new_list[giver])
-        old_receivers = set(old_list.get(giver, []))
-        common = new_receivers & old_receivers
-        if common:
-            overlaps.append((giver, list(common)))
+    overlaps = overlap_details(new_list, old_list)
     
     if overlaps:
-        for giver, receivers in overlaps:
+        for giver, receivers in overlaps.items():
             print(f"   {giver} beschenkt wieder: {', '.join(receivers)}")
     else:
         print(f"   ✓ Keine Überschneidungen!")
     
-    print(f"   Gesamt: {count_overlaps(new_list, old_list)} Überschneidungen")
+    print(f"   Gesamt: {sum(len(receivers) for receivers in overlaps.values())} Überschneidungen")
 
 
 # Beispielverwendung
@@ -0,0 +1,253 @@
+import math
+import random
+import time
+from typing import List, Dict, Set, Optional
+
+from secretSanta_base8 import print_assignments, validate_assignments
+from secretSanta_constraints import Constraints
+
+
+def _shifted_rounds(n: int, rounds: int) -> List[List[int]]:
+    """
+    Gültige Startzuordnung in O(n · rounds): Teilnehmer zufällig im Kreis anordnen,
+    in Runde k beschenkt jeder den (k+1)-ten Nachbarn. Verschiedene Abstände
+    1..rounds < n garantieren weder Selbst- noch doppelte Kanten.
+    """
+    order = list(range(n))
+    random.shuffle(order)
+    perms = []
+    for shift in range(1, rounds + 1):
+        perm = [0] * n
+        for i, giver in enumerate(order):
+            perm[giver] = order[(i + shift) % n]
+        perms.append(perm)
+    return perms
+
+
+def _index_sets(liste: Optional[Dict[str, List[str]]], index: Dict[str, int]) -> List[Set[int]]:
+    """Vorjahresliste als Empfänger-Indexmenge pro Giver-Index."""
+    sets = [set() for _ in index]
+    for giver, receivers in (liste or {}).items():
+        g = index.get(giver)
+        if g is None:
+            continue
+        sets[g].update(index[r] for r in receivers if r in index)
+    return sets
+
+
+def anneal_secret_santa(participants: List[str], rounds: int = 3,
+                        liste1: Optional[Dict[str, List[str]]] = None,
+                        liste2: Optional[Dict[str, List[str]]] = None,
+                        steps: Optional[int] = None,
+                        time_budget: Optional[float] = None,
+                        start_temperature: float = 2.0,
+                        end_temperature: float = 0.05,
+                        initial: Optional[Dict[str, List[str]]] = None,
+                        constraints: Optional[Constraints] = None) -> Dict:
+    """
+    Lokale Suche (Simulated Annealing) für große Gruppen, in denen die exakte
+    Suche von OptimizedSecretSantaSolver nicht mehr durchkommt.
+
+    Startet von einer gültigen Zuordnung und verbessert lexikographisch erst die
+    Überschneidungen mit Liste 1, dann mit Liste 2. Alle Züge bleiben gültig:
+    - Empfänger zweier Giver einer Runde tauschen
+    - Empfänger dreier Giver einer Runde rotieren
+    Jeder Zug ändert höchstens drei Kanten, die Bewertung ist daher O(1).
+    Verschlechterungen werden mit exp(-delta / T) angenommen (delta in Liste-1-
+    Kanten, bei gleichem Liste-1-Overlap in Liste-2-Kanten), T fällt geometrisch.
+    Die Hälfte der Züge setzt bei einem Giver an, der gerade eine Überschneidung hat.
+    
+    Regeln aus `constraints` bilden die oberste Stufe der lexikographischen
+    Bewertung (verbotene Kanten plus Kanten gegenseitiger Paare), der Start darf
+    sie also verletzen. Bleibt ein Verstoß übrig, wird RuntimeError ausgelöst.
+
+    Args:
+        participants: Liste der Teilnehmernamen
+        rounds: Anzahl der Runden
+        liste1, liste2: Vorjahreslisten wie bei OptimizedSecretSantaSolver
+        steps: Anzahl Züge (Standard: 50 · n · rounds, mindestens 100.000)
+        time_budget: Optionale Obergrenze in Sekunden
+        start_temperature, end_temperature: Temperaturverlauf
+        initial: Startzuordnung (z.B. aus generate_secret_santa); Standard ist eine
+            zufällige Kreisverschiebung (_shifted_rounds), die auch für tausende
+            Teilnehmer sofort vorliegt
+        constraints: Zusätzliche Regeln (secretSanta_constraints)
+
+    Returns:
+        Dictionary mit 'assignment', 'overlap_liste1', 'overlap_liste2', 'steps',
+        'accepted' und 'time_elapsed'
+    """
+    start_time = time.time()
+    n = len(participants)
+    if n < rounds + 1:
+        raise ValueError(f"Mindestens {rounds + 1} Teilnehmer erforderlich für {rounds} Runden")
+
+    index = {p: i for i, p in enumerate(participants)}
+    if initial is not None:
+        perms = [[index[initial[p][k]] for p in participants] for k in range(rounds)]
+    else:
+        perms = _shifted_rounds(n, rounds)
+    if steps is None:
+        steps = max(100000, 50 * n * rounds)
+    deadline = start_time + time_budget if time_budget is not None else float('inf')
+
+    received = [{perm[g] for perm in perms} for g in range(n)]
+    bad1 = _index_sets(liste1, index)
+    bad2 = _index_sets(liste2, index)
+    # Regeln: verbotene Empfänger je Giver, gegenseitige Paare über die Umkehrpermutation
+    bad0 = [set() for _ in range(n)]
+    if constraints:
+        for g, mask in enumerate(constraints.forbidden_masks(participants)):
+            bad0[g] = {r for r in range(n) if mask >> r & 1}
+    no_reciprocal = bool(constraints and constraints.no_reciprocal)
+    constrained = bool(constraints)
+    inverse = []
+    for perm in perms:
+        inv = [0] * n
+        for g, r in enumerate(perm):
+            inv[r] = g
+        inverse.append(inv)
+
+    # Wie delta0: verbotene Kanten plus jede Kante eines gegenseitigen Paars einzeln
+    violations = sum(1 for perm in perms for g in range(n) if perm[g] in bad0[g])
+    if no_reciprocal:
+        violations += sum(1 for perm in perms for g in range(n) if perm[perm[g]] == g)
+    overlap1 = sum(1 for perm in perms for g in range(n) if perm[g] in bad1[g])
+    overlap2 = sum(1 for perm in perms for g in range(n) if perm[g] in bad2[g])
+    best = (violations, overlap1, overlap2)
+    best_perms = [perm.copy() for perm in perms]
+
+    # Kanten (Runde, Giver) mit Überschneidung oder Regelverstoß; wird lazy bereinigt
+    hot = [(k, g) for k, perm in enumerate(perms) for g in range(n)
+           if perm[g] in bad1[g] or perm[g] in bad2[g] or perm[g] in bad0[g] or
+           (no_reciprocal and perm[perm[g]] == g)]
+
+    cooling = (end_temperature / start_temperature) ** (1.0 / steps)
+    temperature = start_temperature
+    accepted = 0
+    step = 0
+
+    while step < steps and best != (0, 0, 0):
+        step += 1
+        temperature *= cooling
+        if not step & 1023 and time.time() >= deadline:
+            break
+
+        # Ersten Giver wählen: bevorzugt einen mit Überschneidung
+        if hot and random.random() < 0.5:
+            i = random.randrange(len(hot))
+            k, a = hot[i]
+            ra = perms[k][a]
+            if (ra not in bad1[a] and ra not in bad2[a] and ra not in bad0[a] and
+                    not (no_reciprocal and perms[k][ra] == a)):
+                hot[i] = hot[-1]
+                hot.pop()
+                continue
+        else:
+            k = random.randrange(rounds)
+            a = random.randrange(n)
+        perm = perms[k]
+
+        if n >= 3 and random.random() < 0.5:
+            # a -> rb, b -> rc, c -> ra
+            b = random.randrange(n)
+            c = random.randrange(n)
+            if a == b or b == c or a == c:
+                continue
+            ra, rb, rc = perm[a], perm[b], perm[c]
+            if (rb == a or rc == b or ra == c or
+                    rb in received[a] or rc in received[b] or ra in received[c]):
+                continue
+            delta1 = ((rb in bad1[a]) + (rc in bad1[b]) + (ra in bad1[c])
+                      - (ra in bad1[a]) - (rb in bad1[b]) - (rc in bad1[c]))
+            delta2 = ((rb in bad2[a]) + (rc in bad2[b]) + (ra in bad2[c])
+                      - (ra in bad2[a]) - (rb in bad2[b]) - (rc in bad2[c]))
+            moves = ((a, ra, rb), (b, rb, rc), (c, rc, ra))
+        else:
+            b = random.randrange(n)
+            ra, rb = perm[a], perm[b]
+            if a == b or rb == a or ra == b or rb in received[a] or ra in received[b]:
+                continue
+            delta1 = (rb in bad1[a]) + (ra in bad1[b]) - (ra in bad1[a]) - (rb in bad1[b])
+            delta2 = (rb in bad2[a]) + (ra in bad2[b]) - (ra in bad2[a]) - (rb in bad2[b])
+            moves = ((a, ra, rb), (b, rb, ra))
+
+        delta0 = 0
+        if constrained:
+            delta0 = sum((new in bad0[giver]) - (old in bad0[giver]) for giver, old, new in moves)
+            if no_reciprocal:
+                # Betroffen sind Kanten der bewegten Giver und Kanten, die auf sie zeigen
+                # (vor und nach dem Zug); Zug dafür kurz anwenden
+                inv = inverse[k]
+                moved = {giver for giver, _, _ in moves}
+                new_giver_of = {new: giver for giver, _, new in moves}
+                sources = moved | {inv[x] for x in moved} | {new_giver_of[x] for x in moved
+                                                             if x in new_giver_of}
+                before = sum(perm[perm[g]] == g for g in sources)
+                for giver, _, new in moves:
+                    perm[giver] = new
+                delta0 += sum(perm[perm[g]] == g for g in sources) - before
+                for giver, old, _ in moves:
+                    perm[giver] = old
+
+        # Lexikographische Metropolis-Regel
+        delta = delta0 if delta0 else (delta1 if delta1 else delta2)
+        if delta > 0 and random.random() >= math.exp(-delta / temperature):
+            continue
+
+        for giver, old, new in moves:
+            received[giver].remove(old)
+            received[giver].add(new)
+            perm[giver] = new
+            inverse[k][new] = giver
+        for giver, old, new in moves:
+            if (new in bad1[giver] or new in bad2[giver] or new in bad0[giver] or
+                    (no_reciprocal and perm[new] == giver)):
+                hot.append((k, giver))
+        violations += delta0
+        overlap1 += delta1
+        overlap2 += delta2
+        accepted += 1
+
+        if (violations, overlap1, overlap2) < best:
+            best = (violations, overlap1, overlap2)
+            best_perms = [p.copy() for p in perms]
+
+    if best[0]:
+        raise RuntimeError(f"Lokale Suche hat keine regelkonforme Zuordnung gefunden "
+                           f"({best[0]} verletzte Kanten)")
+    assignment = {participants[g]: [participants[perm[g]] for perm in best_perms]
+                  for g in range(n)}
+    if not validate_assignments(assignment, participants, rounds, verbose=False,
+                                constraints=constraints):
+        raise RuntimeError("Lokale Suche hat eine ungültige Zuordnung erzeugt")
+
+    return {
+        'assignment': assignment,
+        'overlap_liste1': best[1],
+        'overlap_liste2': best[2],
+        'steps': step,
+        'accepted': accepted,
+        'time_elapsed': time.time() - start_time
+    }
+
+
+# Beispielverwendung
+if __name__ == "__main__":
+    teilnehmer = [f"Person {i:03d}" for i in range(300)]
+
+    # Zufällige Vorjahreslisten mit je 3 Empfängern
+    liste1_vorjahr = {p: random.sample([q for q in teilnehmer if q != p], 3) for p in teilnehmer}
+    liste2_vorvorjahr = {p: random.sample([q for q in teilnehmer if q != p], 3) for p in teilnehmer}
+
+    print(f"Lokale Suche für {len(teilnehmer)} Teilnehmer mit 3 Runden...\n")
+    ergebnis = anneal_secret_santa(teilnehmer, 3, liste1_vorjahr, liste2_vorvorjahr)
+
+    print_assignments(dict(list(sorted(ergebnis['assignment'].items()))[:10]))
+    print(f"\n📊 ERGEBNISSE:")
+    print(f"   Überschneidungen mit Liste 1: {ergebnis['overlap_liste1']}")
+    print(f"   Überschneidungen mit Liste 2: {ergebnis['overlap_liste2']}")
+    print(f"   Züge: {ergebnis['steps']:,} ({ergebnis['accepted']:,} angenommen)")
+    print(f"   Zeit: {ergebnis['time_elapsed']:.2f}s")
+
+    validate_assignments(ergebnis['assignment'], teilnehmer, rounds=3)
@@ -1,14 +1,132 @@
 import random
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Optional
 
-def generate_secret_santa(participants: List[str], rounds: int = 3, max_attempts: int = 1000) -> Dict[str, List[str]]:
+from secretSanta_constraints import Constraints, has_reciprocal
+
+
+def _random_perfect_matching(options: List[Set[int]]) -> Optional[List[int]]:
+    """
+    Zufälliges perfektes Matching (Giver i -> Empfänger) über augmentierende Pfade.
+    Giver und Kandidaten werden gemischt, damit jede Runde anders aussieht.
+    """
+    n = len(options)
+    match_of_receiver = [-1] * n
+    
+    def augment(giver: int, visited: Set[int]) -> bool:
+        candidates = list(options[giver])
+        random.shuffle(candidates)
+        # Erst freie Empfänger probieren, dann Pfade verlängern
+        for receiver in candidates:
+            if match_of_receiver[receiver] == -1:
+                match_of_receiver[receiver] = giver
+                return True
+        for receiver in candidates:
+            if receiver in visited:
+                continue
+            visited.add(receiver)
+            if augment(match_of_receiver[receiver], visited):
+                match_of_receiver[receiver] = giver
+                return True
+        return False
+    
+    givers = list(range(n))
+    random.shuffle(givers)
+    for giver in givers:
+        if not augment(giver, set()):
+            return None
+    
+    perm = [0] * n
+    for receiver, giver in enumerate(match_of_receiver):
+        perm[giver] = receiver
+    return perm
+
+
+def _mix_rounds(perms: List[List[int]], received: List[Set[int]], steps: int,
+                no_reciprocal: bool = False):
+    """
+    Markov-Kette auf gültigen Zuordnungen. Züge, die gültig bleiben:
+    - Empfänger zweier Giver einer Runde tauschen
+    - Empfänger dreier Giver einer Runde rotieren
+    - Einen alternierenden Zyklus zweier Runden zwischen diesen Runden tauschen
+      (jeder Giver behält seine Empfänger, nur die Runde ändert sich)
+    Alle Vorschläge sind symmetrisch, daher ist die Gleichverteilung stationär.
+    
+    Verbotene Kanten stehen (wie bereits vergebene) in received[g] und werden
+    daher nie gezogen. Mit no_reciprocal werden Züge, die ein gegenseitiges Paar
+    erzeugen, wieder zurückgenommen (Ablehnung erhält die Gleichverteilung).
+    """
+    n = len(perms[0])
+    rounds = len(perms)
+    for _ in range(steps):
+        move = random.randrange(3)
+        if move == 0 and rounds >= 2:
+            k, l = random.sample(range(rounds), 2)
+            perm_k, perm_l = perms[k], perms[l]
+            giver_of_l = [0] * n
+            for g, r in enumerate(perm_l):
+                giver_of_l[r] = g
+            start = giver = random.randrange(n)
+            cycle = []
+            while True:
+                nxt = giver_of_l[perm_k[giver]]
+                perm_k[giver], perm_l[giver] = perm_l[giver], perm_k[giver]
+                cycle.append(giver)
+                giver = nxt
+                if giver == start:
+                    break
+            if no_reciprocal and (has_reciprocal(perm_k, cycle) or has_reciprocal(perm_l, cycle)):
+                for giver in cycle:
+                    perm_k[giver], perm_l[giver] = perm_l[giver], perm_k[giver]
+            continue
+        
+        perm = perms[random.randrange(rounds)]
+        if move == 1 and n >= 3:
+            a, b, c = random.sample(range(n), 3)
+            ra, rb, rc = perm[a], perm[b], perm[c]
+            # a -> rb, b -> rc, c -> ra
+            if (rb == a or rc == b or ra == c or
+                    rb in received[a] or rc in received[b] or ra in received[c]):
+                continue
+            perm[a], perm[b], perm[c] = rb, rc, ra
+            if no_reciprocal and has_reciprocal(perm, (a, b, c)):
+                perm[a], perm[b], perm[c] = ra, rb, rc
+                continue
+            received[a].remove(ra); received[b].remove(rb); received[c].remove(rc)
+            received[a].add(rb); received[b].add(rc); received[c].add(ra)
+        else:
+            a, b = random.sample(range(n), 2)
+            ra, rb = perm[a], perm[b]
+            if rb == a or ra == b or rb in received[a] or ra in received[b]:
+                continue
+            perm[a], perm[b] = rb, ra
+            if no_reciprocal and has_reciprocal(perm, (a, b)):
+                perm[a], perm[b] = ra, rb
+                continue
+            received[a].remove(ra); received[b].remove(rb)
+            received[a].add(rb); received[b].add(ra)
+
+
+def generate_secret_santa(participants: List[str], rounds: int = 3, max_attempts: int = 1000,
+                          uniform: bool = False,
+                          constraints: Optional[Constraints] = None) -> Dict[str, List[str]]:
     """
     Generiert eine Secret Santa Zuordnung mit mehreren Runden.
     
+    Jede Runde ist ein zufälliges perfektes Matching auf den noch unbenutzten
+    Kanten (ohne Selbstkanten und ohne Kanten früherer Runden). Dieser Graph ist
+    nach r Runden (n-1-r)-regulär und hat daher nach dem Satz von Hall immer ein
+    perfektes Matching: Ohne constraints kann kein Versuch scheitern, es gibt
+    keine Wiederholungen.
+    
     Args:
         participants: Liste der Teilnehmernamen
         rounds: Anzahl der Runden (jeder beschenkt X Personen)
-        max_attempts: Maximale Versuche für die Generierung
+        max_attempts: Versuche bei constraints (verbotene Kanten brechen die
+            Regularität, no_reciprocal verwirft Runden mit gegenseitigen Paaren)
+        uniform: Zusätzlich n² · rounds Schritte einer Markov-Kette aus
+            gültigkeitserhaltenden Zügen ausführen, um annähernd gleichverteilt
+            aus allen gültigen Zuordnungen zu ziehen
+        constraints: Zusätzliche Regeln (secretSanta_constraints)
     
     Returns:
         Dictionary mit Teilnehmer als Key und Liste der zu beschenkenden Personen
@@ -18,54 +136,40 @@ def generate_secret_santa(participants: List[str], rounds: int = 3, max_attempts
     if n < rounds + 1:
         raise ValueError(f"Mindestens {rounds + 1} Teilnehmer erforderlich für {rounds} Runden")
     
-    for attempt in range(max_attempts):
-        try:
-            assignments = {p: [] for p in participants}
-            
-            # Für jede Runde
-            for round_num in range(rounds):
-                # Erstelle eine Permutation für diese Runde
-                givers = participants.copy()
-                receivers = participants.copy()
-                random.shuffle(receivers)
-                
-                # Prüfe und korrigiere die Permutation
-                for i, giver in enumerate(givers):
-                    receiver = receivers[i]
-                    attempts_fix = 0
-                    
-                    # Stelle sicher, dass niemand sich selbst beschenkt
-                    # und niemand jemanden zweimal beschenkt
-                    while (receiver == giver or receiver in assignments[giver]) and attempts_fix < n * 2:
-                        # Tausche mit einer zufälligen anderen Position
-                        swap_idx = random.randint(0, n - 1)
-                        receivers[i], receivers[swap_idx] = receivers[swap_idx], receivers[i]
-                        receiver = receivers[i]
-                        attempts_fix += 1
-                    
-                    if receiver == giver or receiver in assignments[giver]:
-                        # Dieser Versuch ist fehlgeschlagen
-                        raise ValueError("Keine gültige Zuordnung gefunden")
-                    
-                    assignments[giver].append(receiver)
-                
-                # Validiere diese Runde: Jeder muss genau einmal als Empfänger vorkommen
-                receivers_count = {}
-                for receiver_list in assignments.values():
-                    if len(receiver_list) == round_num + 1:
-                        last_receiver = receiver_list[-1]
-                        receivers_count[last_receiver] = receivers_count.get(last_receiver, 0) + 1
-                
-                if any(count != 1 for count in receivers_count.values()) or len(receivers_count) != n:
-                    raise ValueError("Ungültige Verteilung der Empfänger")
-            
-            return assignments
-            
-        except ValueError:
-            # Dieser Versuch ist fehlgeschlagen, versuche es erneut
-            continue
+    # forbidden[g]: Empfänger, die g nach den Regeln nie zugeordnet werden dürfen
+    forbidden = [set() for _ in range(n)]
+    if constraints:
+        for g, mask in enumerate(constraints.forbidden_masks(participants)):
+            forbidden[g] = {r for r in range(n) if mask >> r & 1}
+    no_reciprocal = bool(constraints and constraints.no_reciprocal)
+    
+    attempts = 0
+    while True:
+        # options[g]: Empfänger, die g noch zugeordnet werden dürfen
+        options = [set(range(n)) - {g} - forbidden[g] for g in range(n)]
+        perms = []
+        while len(perms) < rounds:
+            perm = _random_perfect_matching(options)
+            if perm is not None and not (no_reciprocal and has_reciprocal(perm)):
+                for giver, receiver in enumerate(perm):
+                    options[giver].discard(receiver)
+                perms.append(perm)
+                continue
+            attempts += 1
+            if attempts >= max_attempts or (perm is None and not constraints):
+                # Ohne Regeln nach dem Satz von Hall ausgeschlossen
+                raise RuntimeError("Keine gültige Zuordnung gefunden")
+            if perm is None:
+                # Frühere Runden haben die Restkanten verbaut: neu beginnen
+                break
+        if len(perms) == rounds:
+            break
+    
+    if uniform and rounds:
+        received = [{perm[g] for perm in perms} | forbidden[g] for g in range(n)]
+        _mix_rounds(perms, received, n * n * rounds, no_reciprocal)
     
-    raise RuntimeError(f"Konnte keine gültige Zuordnung nach {max_attempts} Versuchen finden")
+    return {participants[g]: [participants[perm[g]] for perm in perms] for g in range(n)}
 
 
 def print_assignments(assignments: Dict[str, List[str]]):
@@ -85,43 +189,54 @@ def print_assignments(assignments: Dict[str, List[str]]):
     print("\n" + "="*60)
 
 
-def validate_assignments(assignments: Dict[str, List[str]], participants: List[str], rounds: int) -> bool:
-    """Validiert die Zuordnungen"""
-    print("\nValidierung:")
+def validate_assignments(assignments: Dict[str, List[str]], participants: List[str], rounds: int,
+                         verbose: bool = True, constraints: Optional[Constraints] = None) -> bool:
+    """Validiert die Zuordnungen (verbose=False: nur Ergebnis, keine Ausgabe), optional auch gegen constraints"""
+    log = print if verbose else (lambda *args: None)
+    log("\nValidierung:")
     
     # 1. Jeder hat genau 'rounds' Zuordnungen
     for giver, receivers in assignments.items():
         if len(receivers) != rounds:
-            print(f"❌ {giver} hat {len(receivers)} statt {rounds} Zuordnungen")
+            log(f"❌ {giver} hat {len(receivers)} statt {rounds} Zuordnungen")
             return False
-    print(f"✓ Jeder Teilnehmer beschenkt {rounds} Personen")
+    log(f"✓ Jeder Teilnehmer beschenkt {rounds} Personen")
     
     # 2. Niemand beschenkt sich selbst
     for giver, receivers in assignments.items():
         if giver in receivers:
-            print(f"❌ {giver} beschenkt sich selbst")
+            log(f"❌ {giver} beschenkt sich selbst")
             return False
-    print("✓ Niemand beschenkt sich selbst")
+    log("✓ Niemand beschenkt sich selbst")
     
     # 3. Niemand beschenkt jemanden zweimal
     for giver, receivers in assignments.items():
         if len(receivers) != len(set(receivers)):
-            print(f"❌ {giver} beschenkt jemanden mehrfach")
+            log(f"❌ {giver} beschenkt jemanden mehrfach")
             return False
-    print("✓ Niemand beschenkt jemanden mehrfach")
+    log("✓ Niemand beschenkt jemanden mehrfach")
     
     # 4. In jeder Runde erhält jeder Teilnehmer genau ein Geschenk
     for round_num in range(rounds):
         receivers_in_round = [receivers[round_num] for receivers in assignments.values()]
         if len(receivers_in_round) != len(set(receivers_in_round)):
-            print(f"❌ Runde {round_num + 1}: Manche erhalten mehrere Geschenke")
+            log(f"❌ Runde {round_num + 1}: Manche erhalten mehrere Geschenke")
             return False
         if set(receivers_in_round) != set(participants):
-            print(f"❌ Runde {round_num + 1}: Nicht alle erhalten ein Geschenk")
+            log(f"❌ Runde {round_num + 1}: Nicht alle erhalten ein Geschenk")
+            return False
+    log(f"✓ In jeder Runde erhält jeder genau ein Geschenk")
+    
+    # 5. Zusätzliche Regeln (Ausschlüsse, Paare, kein gegenseitiges Beschenken)
+    if constraints:
+        violations = constraints.violations(assignments)
+        if violations:
+            for message in violations:
+                log(f"❌ {message}")
             return False
-    print(f"✓ In jeder Runde erhält jeder genau ein Geschenk")
+        log("✓ Alle Zusatzregeln eingehalten")
     
-    print("\n✅ Alle Validierungen erfolgreich!")
+    log("\n✅ Alle Validierungen erfolgreich!")
     return True
 
 
@@ -0,0 +1,165 @@
+import os
+import random
+import time
+from typing import Dict, Iterable, Iterator, Optional
+
+from secretSanta_constraints import Constraints
+
+# Engines (und der Prozess-Pool) werden erst im jeweiligen Zweig importiert:
+# secretSanta_cli ruft solve_group pro Aufruf einmal auf, und ein Lauf mit
+# engine='generator' soll weder Solver noch multiprocessing laden.
+
+
+def solve_group(spec: Dict) -> Dict:
+    """
+    Löst eine einzelne Gruppe.
+
+    Args:
+        spec: Gruppenbeschreibung mit den Schlüsseln
+            'participants' (Pflicht), 'rounds' (Standard 3),
+            'liste1' / 'liste2' (optionale Vorjahreslisten),
+            'history' / 'decay' (gewichtete Historie, nur solver, siehe
+            OptimizedSecretSantaSolver),
+            'engine' ('solver', 'generator' oder 'anneal', Standard 'solver'),
+            'max_solutions_per_level', 'time_budget', 'node_budget' (nur solver,
+            siehe OptimizedSecretSantaSolver.solve; time_budget auch bei anneal),
+            'seed' (optional),
+            'cache' (Pfad einer SolutionCache-Datenbank, nur solver),
+            'constraints' (Regeln wie bei Constraints.from_dict, alle Engines)
+
+    Returns:
+        Dictionary mit 'assignment' (None, falls keine Lösung), 'time_elapsed' und
+        bei engine='solver' bzw. 'anneal' den Overlap-Statistiken der Engine
+    """
+    participants = spec['participants']
+    rounds = spec.get('rounds', 3)
+    engine = spec.get('engine', 'solver')
+    constraints = Constraints.from_dict(spec.get('constraints'))
+    if spec.get('seed') is not None:
+        random.seed(spec['seed'])
+
+    start_time = time.time()
+
+    if engine == 'generator':
+        from secretSanta_base8 import generate_secret_santa
+        assignment = generate_secret_santa(participants, rounds, constraints=constraints)
+        return {
+            'assignment': assignment,
+            'time_elapsed': time.time() - start_time
+        }
+
+    if engine == 'anneal':
+        from secretSanta_anneal import anneal_secret_santa
+        result = anneal_secret_santa(participants, rounds,
+                                     liste1=spec.get('liste1'),
+                                     liste2=spec.get('liste2'),
+                                     time_budget=spec.get('time_budget'),
+                                     constraints=constraints)
+        result['time_elapsed'] = time.time() - start_time
+        return result
+
+    if engine != 'solver':
+        raise ValueError(f"Unbekannte Engine: {engine}")
+
+    from secretSanta import OptimizedSecretSantaSolver
+    from secretSanta_cache import SolutionCache
+
+    # Fortschritt auf stdout wäre im Batch nur Rauschen
+    solver = OptimizedSecretSantaSolver(participants, rounds,
+                                        liste1=spec.get('liste1'),
+                                        liste2=spec.get('liste2'),
+                                        history=spec.get('history'),
+                                        decay=spec.get('decay', 0.5),
+                                        verbose=False,
+                                        constraints=constraints)
+    cache = SolutionCache(spec['cache']) if spec.get('cache') else None
+    try:
+        result = solver.solve(spec.get('max_solutions_per_level', 1000000),
+                              time_budget=spec.get('time_budget'),
+                              node_budget=spec.get('node_budget'),
+                              cache=cache)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if result is None:
+        return {
+            'assignment': None,
+            'nodes_explored': solver.total_nodes_explored,
+            'branches_pruned': solver.total_branches_pruned,
+            'time_elapsed': time.time() - start_time
+        }
+    result['time_elapsed'] = time.time() - start_time
+    return result
+
+
+def _solve_indexed(index: int, spec: Dict) -> Dict:
+    """Worker-Task: Löst eine Gruppe und verpackt Fehler statt sie zu werfen."""
+    start_time = time.time()
+    try:
+        result = solve_group(spec)
+        error = None
+    except Exception as exc:
+        result = {'assignment': None, 'time_elapsed': time.time() - start_time}
+        error = f"{type(exc).__name__}: {exc}"
+    result['group'] = spec.get('name', index)
+    result['index'] = index
+    result['error'] = error
+    return result
+
+
+def solve_batch(groups: Iterable[Dict], workers: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Löst viele unabhängige Gruppen parallel in einem Prozess-Pool.
+
+    Ergebnisse werden in Fertigstellungsreihenfolge geliefert, sobald eine Gruppe
+    fertig ist. Jedes Ergebnis enthält 'group' (spec['name'] oder die Position in
+    `groups`), 'index', 'error' (None bei Erfolg), 'time_elapsed' sowie die Felder
+    aus solve_group. Die Gruppen werden erst bei Bedarf aus `groups` gelesen.
+
+    Args:
+        groups: Gruppenbeschreibungen, siehe solve_group
+        workers: Anzahl Prozesse (Standard: Anzahl CPUs)
+    """
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+    workers = workers or os.cpu_count() or 1
+    specs = enumerate(groups)
+    pending = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Höchstens 2 Aufgaben pro Worker gleichzeitig einreichen
+        for index, spec in specs:
+            pending.add(executor.submit(_solve_indexed, index, spec))
+            if len(pending) >= 2 * workers:
+                break
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for index, spec in specs:
+                    pending.add(executor.submit(_solve_indexed, index, spec))
+                    break
+                yield future.result()
+
+
+# Beispielverwendung
+if __name__ == "__main__":
+    teams = [
+        {'name': 'Team A', 'participants': ["Alice", "Bob", "Charlie", "Diana", "Eva"], 'rounds': 2},
+        {'name': 'Team B', 'participants': ["Frank", "Grace", "Henry", "Ida", "Jonas", "Kim"],
+         'rounds': 3, 'liste1': {'Frank': ['Grace'], 'Grace': ['Henry']}},
+        {'name': 'Team C', 'participants': ["Lena", "Max", "Nora", "Otto"], 'rounds': 3,
+         'engine': 'generator'},
+    ]
+
+    for result in solve_batch(teams):
+        if result['error']:
+            print(f"❌ {result['group']}: {result['error']}")
+            continue
+        print(f"\n✓ {result['group']} ({result['time_elapsed']:.2f}s)")
+        if 'nodes_explored' in result:
+            print(f"   Knoten erkundet: {result['nodes_explored']:,}, "
+                  f"Branches gepruned: {result['branches_pruned']:,}")
+        for giver, receivers in sorted(result['assignment'].items()):
+            print(f"   {giver:<10} -> {', '.join(receivers)}")
@@ -0,0 +1,234 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import List, Dict, Optional
+
+from secretSanta import OptimizedSecretSantaSolver
+from secretSanta_base8 import generate_secret_santa, validate_assignments
+from secretSanta_anneal import anneal_secret_santa
+
+
+def random_history(participants: List[str], density: float, rng: random.Random) -> Dict[str, List[str]]:
+    """
+    Zufällige Vorjahresliste: Jeder Giver hat round(density · (n-1)) Empfänger.
+    """
+    k = round(density * (len(participants) - 1))
+    return {p: rng.sample([q for q in participants if q != p], k) for p in participants}
+
+
+def _run_engine(engine: str, participants: List[str], rounds: int,
+                liste1: Dict[str, List[str]], liste2: Dict[str, List[str]],
+                time_budget: Optional[float], max_solutions_per_level: int,
+                record: Dict) -> Optional[Dict[str, List[str]]]:
+    """Ein Lauf der Engine; trägt Engine-Statistiken in `record` ein."""
+    if engine == 'solver':
+        solver = OptimizedSecretSantaSolver(participants, rounds, liste1, liste2, verbose=False)
+        result = solver.solve(max_solutions_per_level, time_budget=time_budget)
+        record['nodes'] = solver.total_nodes_explored
+        record['pruned'] = solver.total_branches_pruned
+        record['search_complete'] = bool(result) and result['search_complete']
+        record['overlap_liste1'] = result['overlap_liste1'] if result else None
+        return result['assignment'] if result else None
+    if engine == 'generator':
+        return generate_secret_santa(participants, rounds)
+    if engine == 'anneal':
+        result = anneal_secret_santa(participants, rounds, liste1, liste2, time_budget=time_budget)
+        record['overlap_liste1'] = result['overlap_liste1']
+        return result['assignment']
+    raise ValueError(f"Unbekannte Engine: {engine}")
+
+
+def run_case(engine: str, n: int, rounds: int, density: float, seed: int,
+             time_budget: Optional[float] = None,
+             max_solutions_per_level: int = 1000) -> Dict:
+    """
+    Führt einen einzelnen, vollständig geseedeten Benchmark-Lauf aus.
+
+    Zeit und Ergebnis stammen aus einem Lauf ohne tracemalloc (das Tracing
+    verlangsamt allokationsintensive Läufe um ein Vielfaches), der
+    Speicherbedarf aus einem zweiten, identisch geseedeten Lauf mit tracemalloc.
+    Bei greifendem time_budget kommt der zweite Lauf weniger weit, sein Wert ist
+    dann eine Untergrenze.
+
+    Returns:
+        Datensatz mit Konfiguration, 'success' (gültige Zuordnung gefunden),
+        'time', 'peak_memory' (Bytes laut tracemalloc), bei 'solver' und 'anneal'
+        'overlap_liste1', bei 'solver' zusätzlich 'nodes', 'pruned' und
+        'search_complete' (False, wenn das Zeitlimit gegriffen hat)
+    """
+    rng = random.Random(seed)
+    participants = [f"P{i}" for i in range(n)]
+    liste1 = random_history(participants, density, rng)
+    liste2 = random_history(participants, density, rng)
+    args = (engine, participants, rounds, liste1, liste2, time_budget, max_solutions_per_level)
+
+    record = {'engine': engine, 'n': n, 'rounds': rounds, 'density': density, 'seed': seed}
+    random.seed(seed)
+    start_time = time.perf_counter()
+    try:
+        assignment = _run_engine(*args, record)
+        record['error'] = None
+    except (ValueError, RuntimeError) as exc:
+        assignment = None
+        record['error'] = f"{type(exc).__name__}: {exc}"
+    record['time'] = time.perf_counter() - start_time
+
+    random.seed(seed)
+    tracemalloc.start()
+    try:
+        _run_engine(*args, {})
+    except (ValueError, RuntimeError):
+        pass
+    record['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    record['success'] = (assignment is not None and
+                         validate_assignments(assignment, participants, rounds, verbose=False))
+    return record
+
+
+def run_sweep(engines: List[str], sizes: List[int], rounds_list: List[int],
+              densities: List[float], repeats: int, seed: int = 0,
+              time_budget: Optional[float] = None,
+              max_solutions_per_level: int = 1000) -> Dict:
+    """
+    Kartesisches Produkt aller Parameter, je `repeats` Läufe mit Seeds
+    seed, seed+1, ... Ungültige Kombinationen (rounds >= n) werden übersprungen.
+
+    Returns:
+        {'meta': Umgebung und Parameter, 'runs': Einzelläufe, 'summary': pro
+        Konfiguration Mittelwerte und Erfolgsquote}
+    """
+    runs = []
+    for engine in engines:
+        for n in sizes:
+            for rounds in rounds_list:
+                if rounds >= n:
+                    continue
+                for density in densities:
+                    for r in range(repeats):
+                        record = run_case(engine, n, rounds, density, seed + r,
+                                          time_budget, max_solutions_per_level)
+                        runs.append(record)
+                        print(f"  {engine:<9} n={n:<4} rounds={rounds} density={density:<4} "
+                              f"seed={seed + r}: {record['time']:.3f}s "
+                              f"{'✓' if record['success'] else '❌'}", file=sys.stderr)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seed': seed,
+            'repeats': repeats,
+            'time_budget': time_budget,
+            'max_solutions_per_level': max_solutions_per_level
+        },
+        'runs': runs,
+        'summary': summarize(runs)
+    }
+
+
+def _config_key(record: Dict) -> str:
+    return f"{record['engine']}/n={record['n']}/rounds={record['rounds']}/density={record['density']}"
+
+
+def summarize(runs: List[Dict]) -> Dict[str, Dict]:
+    """Fasst die Läufe pro Konfiguration zusammen (Mittelwerte, Erfolgsquote)."""
+    groups = {}
+    for record in runs:
+        groups.setdefault(_config_key(record), []).append(record)
+
+    summary = {}
+    for key, records in groups.items():
+        entry = {
+            'runs': len(records),
+            'success_rate': sum(r['success'] for r in records) / len(records),
+            'mean_time': sum(r['time'] for r in records) / len(records),
+            'max_peak_memory': max(r['peak_memory'] for r in records)
+        }
+        if 'nodes' in records[0]:
+            entry['mean_nodes'] = sum(r['nodes'] for r in records) / len(records)
+            entry['mean_pruned'] = sum(r['pruned'] for r in records) / len(records)
+            entry['complete_rate'] = sum(r['search_complete'] for r in records) / len(records)
+        if 'overlap_liste1' in records[0]:
+            overlaps = [r['overlap_liste1'] for r in records if r['overlap_liste1'] is not None]
+            entry['mean_overlap_liste1'] = sum(overlaps) / len(overlaps) if overlaps else None
+        summary[key] = entry
+    return summary
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 1.2,
+            min_delta: float = 0.05) -> List[str]:
+    """
+    Vergleicht zwei Benchmark-Ergebnisse (z.B. zweier Versionen) pro Konfiguration.
+
+    Returns:
+        Konfigurationen mit Regression: mittlere Zeit um mehr als Faktor
+        `threshold` und mehr als `min_delta` Sekunden langsamer (Millisekunden-
+        Läufe schwanken sonst zu stark) oder gesunkene Erfolgsquote
+    """
+    regressions = []
+    for key, new in sorted(current['summary'].items()):
+        old = baseline['summary'].get(key)
+        if old is None:
+            continue
+        ratio = new['mean_time'] / old['mean_time'] if old['mean_time'] > 0 else 1.0
+        print(f"{key:<45} {old['mean_time']:8.3f}s -> {new['mean_time']:8.3f}s "
+              f"(x{ratio:.2f}), Erfolg {old['success_rate']:.0%} -> {new['success_rate']:.0%}",
+              file=sys.stderr)
+        slower = ratio > threshold and new['mean_time'] - old['mean_time'] > min_delta
+        if slower or new['success_rate'] < old['success_rate']:
+            regressions.append(key)
+    return regressions
+
+
+def _number_list(text: str, cast=int) -> List:
+    return [cast(part) for part in text.split(',') if part]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark für Solver und Generator")
+    parser.add_argument('--engines', default='solver,generator')
+    parser.add_argument('--sizes', default='5,7,9')
+    parser.add_argument('--rounds', default='2,3')
+    parser.add_argument('--densities', default='0,0.25,0.5')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--time-budget', type=float, default=30.0,
+                        help="Zeitlimit pro Lauf (solver, anneal) in Sekunden; beim Solver "
+                             "erscheint eine Überschreitung als search_complete=False")
+    parser.add_argument('--max-solutions', type=int, default=1000,
+                        help="max_solutions_per_level für den Solver")
+    parser.add_argument('--output', help="JSON-Datei für die Ergebnisse (Standard: stdout)")
+    parser.add_argument('--compare', help="Früheres JSON-Ergebnis, gegen das verglichen wird")
+    args = parser.parse_args(argv)
+
+    results = run_sweep(args.engines.split(','), _number_list(args.sizes), _number_list(args.rounds),
+                        _number_list(args.densities, float), args.repeats, args.seed,
+                        args.time_budget, args.max_solutions)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results)
+        if regressions:
+            print(f"\n❌ {len(regressions)} Regression(en): {', '.join(regressions)}", file=sys.stderr)
+            return 1
+        print("\n✅ Keine Regressionen", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
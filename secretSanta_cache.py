@@ -0,0 +1,199 @@
+import hashlib
+import json
+import sqlite3
+from array import array
+from typing import List, Dict, Optional
+
+from secretSanta_constraints import Constraints
+
+
+# Bei inkompatiblen Änderungen an Schlüssel oder Eintragsformat erhöhen
+CACHE_FORMAT = 2
+
+
+def _canonical_liste(liste: Optional[Dict[str, List[str]]], names: List[str]) -> List[List[str]]:
+    """Vorjahresliste auf die Teilnehmer beschränkt, sortiert und ohne Duplikate."""
+    known = set(names)
+    liste = liste or {}
+    return [sorted(set(liste.get(p, [])) & known) for p in names]
+
+
+def problem_fingerprint(participants: List[str], rounds: int,
+                        liste1: Optional[Dict[str, List[str]]] = None,
+                        liste2: Optional[Dict[str, List[str]]] = None,
+                        history: Optional[List[Dict[str, List[str]]]] = None,
+                        weights: Optional[List[int]] = None,
+                        max_solutions_per_level: int = 1000000,
+                        constraints: Optional[Constraints] = None) -> str:
+    """
+    Kanonischer Hash eines Problems (SHA-256, hex).
+
+    Unabhängig von der Reihenfolge der Teilnehmer, der Empfänger in den Listen
+    und von Einträgen für Nicht-Teilnehmer. Mit `history` zählen nur die
+    Historie und ihre Gewichte, liste1/liste2 werden dann ignoriert (wie im
+    Solver). max_solutions_per_level gehört zum Schlüssel, weil das Limit
+    Lösungsanzahl und Liste-2-Auswahl beeinflusst. Regeln (Constraints) gehen
+    in kanonischer Form ein.
+    """
+    names = sorted(participants)
+    if history:
+        lists = {'history': [_canonical_liste(liste, names) for liste in history],
+                 'weights': list(weights or [])}
+    else:
+        lists = {'liste1': _canonical_liste(liste1, names),
+                 'liste2': _canonical_liste(liste2, names)}
+    problem = {
+        'format': CACHE_FORMAT,
+        'participants': names,
+        'rounds': rounds,
+        'lists': lists,
+        'max_solutions_per_level': max_solutions_per_level
+    }
+    if constraints:
+        problem['constraints'] = constraints.to_dict()
+    encoded = json.dumps(problem, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def pack_perms(samples: List[List[List[int]]], participants: List[str]) -> bytes:
+    """
+    Packt Lösungen (je eine Liste von Runden-Permutationen über die Indizes von
+    `participants`) in einen Byte-Puffer. Indizes werden dabei auf die
+    alphabetische Reihenfolge der Namen umgerechnet, damit der Eintrag auch bei
+    anderer Teilnehmer-Reihenfolge passt. 1 Byte pro Eintrag bis 256 Teilnehmer,
+    sonst 4 Bytes.
+    """
+    n = len(participants)
+    order = sorted(range(n), key=participants.__getitem__)
+    rank = [0] * n
+    for c, i in enumerate(order):
+        rank[i] = c
+    packed = array('B' if n <= 256 else 'I')
+    for perms in samples:
+        for perm in perms:
+            packed.extend(rank[perm[i]] for i in order)
+    return packed.tobytes()
+
+
+def unpack_perms(data: bytes, participants: List[str], rounds: int) -> List[List[List[int]]]:
+    """Umkehrung von pack_perms für die (beliebig sortierten) `participants`."""
+    n = len(participants)
+    order = sorted(range(n), key=participants.__getitem__)
+    packed = array('B' if n <= 256 else 'I')
+    packed.frombytes(data)
+    samples = []
+    for start in range(0, len(packed), n * rounds):
+        perms = []
+        for k in range(rounds):
+            row = packed[start + k * n:start + (k + 1) * n]
+            perm = [0] * n
+            for c, r in enumerate(row):
+                perm[order[c]] = order[r]
+            perms.append(perm)
+        samples.append(perms)
+    return samples
+
+
+class SolutionCache:
+    """
+    Persistenter Ergebnis-Cache (SQLite) für OptimizedSecretSantaSolver.solve.
+
+    Pro Problem (siehe problem_fingerprint) werden optimales Level, bester
+    Liste-2-Score, Lösungsanzahlen, Liste-2-Histogramm und bis zu `samples`
+    gleichverteilt gezogene Lösungen des optimalen Levels gespeichert. Ein
+    wiederholter Aufruf wählt daraus zufällig, statt neu zu suchen.
+
+    Begrenzung über `max_entries` und `max_bytes` (Größe der gepackten
+    Lösungen); verdrängt wird der am längsten nicht genutzte Eintrag (LRU).
+    """
+
+    def __init__(self, path: str = 'secretSanta_cache.sqlite', max_entries: int = 1000,
+                 max_bytes: int = 64 * 1024 * 1024, samples: int = 64):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.samples = samples
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " meta TEXT NOT NULL,"
+            " samples BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used INTEGER NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used)")
+        self._conn.commit()
+
+    def _next_tick(self) -> int:
+        """Monoton steigender LRU-Zeitstempel (robust gegen gleiche Uhrzeiten)."""
+        tick, = self._conn.execute("SELECT COALESCE(MAX(last_used), 0) + 1 FROM entries").fetchone()
+        return tick
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Eintrag zu `key` oder None. Ein Treffer zählt als Nutzung (LRU).
+
+        Returns:
+            Die bei put übergebenen Metadaten plus 'samples' (gepackte Bytes,
+            siehe unpack_perms)
+        """
+        row = self._conn.execute("SELECT meta, samples FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self._conn:
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?",
+                               (self._next_tick(), key))
+        entry = json.loads(row[0])
+        entry['samples'] = row[1]
+        return entry
+
+    def put(self, key: str, meta: Dict, samples: bytes):
+        """
+        Speichert (bzw. ersetzt) einen Eintrag und verdrängt danach LRU-Einträge,
+        bis beide Grenzen eingehalten sind. Einträge über max_bytes werden nicht
+        gespeichert.
+        """
+        if len(samples) > self.max_bytes:
+            return
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, meta, samples, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(meta, sort_keys=True), samples, len(samples), self._next_tick()))
+            self._evict()
+
+    def _evict(self):
+        count, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return
+        victims = []
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall()
+        for key, entry_size in rows:
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            size -= entry_size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def clear(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+    def __len__(self) -> int:
+        count, = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        return count
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,184 @@
+import argparse
+import csv
+import json
+import sys
+from typing import List, Dict, Optional, TextIO
+
+# Bewusst nur Standardbibliothek auf Modulebene: Solver, Generator und
+# Prozess-Pool lädt erst secretSanta_batch im gewählten Zweig, damit ein
+# Aufruf aus Shell-Skripten (tausende Male hintereinander) schnell startet.
+
+
+def _open(path: str) -> TextIO:
+    """Datei zum Lesen öffnen, '-' steht für stdin."""
+    if path == '-':
+        return sys.stdin
+    return open(path, encoding='utf-8', newline='')
+
+
+def _csv_rows(f: TextIO) -> List[List[str]]:
+    """CSV-Zeilen ohne Leerzeilen, leere Zellen und Kommentare ('#' am Zeilenanfang)."""
+    rows = []
+    for row in csv.reader(f):
+        cells = [cell.strip() for cell in row if cell.strip()]
+        if cells and not cells[0].startswith('#'):
+            rows.append(cells)
+    return rows
+
+
+def read_participants(path: str) -> List[str]:
+    """
+    Teilnehmer aus einer Datei: '.json' enthält eine Liste von Namen, sonst
+    CSV bzw. Text mit einem Namen in der ersten Spalte jeder Zeile.
+    """
+    with _open(path) as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        return [row[0] for row in _csv_rows(f)]
+
+
+def read_liste(path: str) -> Dict[str, List[str]]:
+    """
+    Vorjahresliste aus einer Datei: '.json' enthält {giver: [empfänger, ...]},
+    sonst CSV mit Zeilen 'giver,empfänger1,empfänger2,...'.
+    """
+    with _open(path) as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        liste = {}
+        for giver, *receivers in _csv_rows(f):
+            liste.setdefault(giver, []).extend(receivers)
+        return liste
+
+
+def read_json(path: str):
+    with _open(path) as f:
+        return json.load(f)
+
+
+def build_spec(args: argparse.Namespace, spec: Optional[Dict] = None) -> Dict:
+    """
+    Gruppenbeschreibung für solve_group aus den Kommandozeilen-Optionen.
+    Gesetzte Optionen überschreiben die Schlüssel aus `spec`.
+    """
+    spec = dict(spec or {})
+    if args.participants:
+        spec['participants'] = read_participants(args.participants)
+    if args.liste1:
+        spec['liste1'] = read_liste(args.liste1)
+    if args.liste2:
+        spec['liste2'] = read_liste(args.liste2)
+    if args.history:
+        spec['history'] = [read_liste(path) for path in args.history]
+    if args.constraints:
+        spec['constraints'] = read_json(args.constraints)
+    options = {
+        'rounds': args.rounds,
+        'engine': args.engine,
+        'decay': args.decay,
+        'time_budget': args.time_budget,
+        'node_budget': args.node_budget,
+        'max_solutions_per_level': args.max_solutions,
+        'seed': args.seed,
+        'cache': args.cache
+    }
+    spec.update((key, value) for key, value in options.items() if value is not None)
+    return spec
+
+
+def _write(result: Dict, out: TextIO, indent: Optional[int] = None):
+    json.dump(result, out, ensure_ascii=False, indent=indent)
+    out.write('\n')
+    out.flush()
+
+
+def run_single(args: argparse.Namespace, out: TextIO) -> int:
+    from secretSanta_batch import solve_group
+
+    spec = build_spec(args, read_json(args.input) if args.input else None)
+    if not spec.get('participants'):
+        raise ValueError("Keine Teilnehmer angegeben (--participants oder 'participants' in INPUT)")
+    result = solve_group(spec)
+    _write(result, out, args.indent)
+    return 0 if result['assignment'] is not None else 1
+
+
+def run_batch(args: argparse.Namespace, out: TextIO) -> int:
+    """
+    JSON Lines: eine Gruppe pro Eingabezeile, ein Ergebnis pro Ausgabezeile (in
+    Fertigstellungsreihenfolge, siehe solve_batch). Kommandozeilen-Optionen
+    gelten hier als Standardwerte, Schlüssel der Zeile haben Vorrang.
+    """
+    from secretSanta_batch import solve_batch
+
+    defaults = build_spec(args)
+
+    def groups():
+        with _open(args.input or '-') as f:
+            for line in f:
+                if line.strip():
+                    yield {**defaults, **json.loads(line)}
+
+    failed = 0
+    for result in solve_batch(groups(), workers=args.jobs):
+        failed += result['error'] is not None or result['assignment'] is None
+        _write(result, out)
+    if failed:
+        print(f"❌ {failed} Gruppe(n) ohne Zuordnung", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Secret Santa von der Kommandozeile: liest Teilnehmer und Vorjahreslisten "
+                    "aus JSON/CSV-Dateien oder stdin und schreibt das Ergebnis als JSON.",
+        epilog="Beispiele:\n"
+               "  python secretSanta_cli.py --participants namen.csv --liste1 2023.csv --rounds 3\n"
+               "  python secretSanta_cli.py gruppe.json --engine anneal --time-budget 5\n"
+               "  cat gruppen.jsonl | python secretSanta_cli.py --batch --jobs 4 > ergebnisse.jsonl",
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', nargs='?',
+                        help="JSON-Gruppenbeschreibung (Schlüssel wie solve_group) oder '-' für "
+                             "stdin; mit --batch JSON Lines (Standard dann stdin)")
+    parser.add_argument('--participants', help="Teilnehmer (.json-Liste oder CSV, erste Spalte)")
+    parser.add_argument('--liste1', help="Vorjahresliste (.json oder CSV 'giver,empfänger,...')")
+    parser.add_argument('--liste2', help="Vorvorjahresliste, Format wie --liste1")
+    parser.add_argument('--history', action='append',
+                        help="Gewichtete Historie, neueste zuerst; mehrfach angeben "
+                             "(ersetzt --liste1/--liste2, nur solver)")
+    parser.add_argument('--decay', type=float, help="Abklingfaktor für --history (Standard 0.5)")
+    parser.add_argument('--constraints', help="Regeln als JSON (siehe Constraints.from_dict)")
+    parser.add_argument('--rounds', type=int, help="Anzahl Runden (Standard 3)")
+    parser.add_argument('--engine', choices=['solver', 'generator', 'anneal'],
+                        help="Standard solver")
+    parser.add_argument('--time-budget', type=float, help="Zeitlimit in Sekunden (solver, anneal)")
+    parser.add_argument('--node-budget', type=int, help="Knotenlimit (nur solver)")
+    parser.add_argument('--max-solutions', type=int, help="max_solutions_per_level (nur solver)")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--cache', help="Pfad einer SolutionCache-Datenbank (nur solver)")
+    parser.add_argument('--batch', action='store_true',
+                        help="Viele Gruppen als JSON Lines parallel lösen")
+    parser.add_argument('--jobs', type=int, help="Prozesse für --batch (Standard: Anzahl CPUs)")
+    parser.add_argument('--output', help="Ausgabedatei (Standard: stdout)")
+    parser.add_argument('--indent', type=int, help="Einrückung der JSON-Ausgabe (nicht bei --batch)")
+    args = parser.parse_args(argv)
+
+    source = args.input or ('-' if args.batch else None)
+    stdin_users = [path for path in [source, args.participants, args.liste1, args.liste2,
+                                     args.constraints, *(args.history or [])] if path == '-']
+    if len(stdin_users) > 1:
+        parser.error("stdin ('-') kann nur für eine Eingabe verwendet werden")
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        return run_batch(args, out) if args.batch else run_single(args, out)
+    except (OSError, ValueError, RuntimeError, KeyError) as exc:
+        print(f"❌ {type(exc).__name__}: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
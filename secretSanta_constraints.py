@@ -0,0 +1,113 @@
+from typing import List, Dict, Set, Tuple, Optional, Iterable
+
+
+class Constraints:
+    """
+    Zusätzliche Regeln für eine Auslosung.
+
+    - exclusions: Giver -> Empfänger, die er nie ziehen darf
+    - couples: Paare, die sich gegenseitig nicht ziehen dürfen (beide Richtungen)
+    - no_reciprocal: In keiner Runde dürfen sich zwei Personen gegenseitig ziehen
+
+    Ausschlüsse und Paare werden zu verbotenen Kanten (forbidden_masks), die der
+    Solver direkt in seine erlaubten Empfänger-Masken einrechnet; sie kosten in
+    der Suche also nichts zusätzlich. no_reciprocal ist eine Bedingung innerhalb
+    einer Runde und wird beim Belegen einer Kante geprüft.
+    """
+
+    def __init__(self, exclusions: Optional[Dict[str, Iterable[str]]] = None,
+                 couples: Optional[Iterable[Tuple[str, str]]] = None,
+                 no_reciprocal: bool = False):
+        self.exclusions: Dict[str, Set[str]] = {}
+        self.couples: List[Tuple[str, str]] = []
+        self.no_reciprocal = no_reciprocal
+        for giver, receivers in (exclusions or {}).items():
+            self.exclude(giver, *receivers)
+        for a, b in couples or []:
+            self.add_couple(a, b)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]) -> Optional['Constraints']:
+        """
+        Aus einer JSON-artigen Beschreibung {'exclusions': {giver: [..]},
+        'couples': [[a, b], ...], 'no_reciprocal': bool}. None bleibt None.
+        """
+        if data is None:
+            return None
+        unknown = set(data) - {'exclusions', 'couples', 'no_reciprocal'}
+        if unknown:
+            raise ValueError(f"Unbekannte Regel(n): {', '.join(sorted(unknown))}")
+        return cls(data.get('exclusions'), [tuple(pair) for pair in data.get('couples', [])],
+                   bool(data.get('no_reciprocal', False)))
+
+    def to_dict(self) -> Dict:
+        """Kanonische, JSON-fähige Form (z.B. für problem_fingerprint)."""
+        return {
+            'exclusions': {giver: sorted(receivers)
+                           for giver, receivers in sorted(self.exclusions.items()) if receivers},
+            'couples': sorted(sorted(pair) for pair in self.couples),
+            'no_reciprocal': self.no_reciprocal
+        }
+
+    def exclude(self, giver: str, *receivers: str) -> 'Constraints':
+        self.exclusions.setdefault(giver, set()).update(receivers)
+        return self
+
+    def add_couple(self, a: str, b: str) -> 'Constraints':
+        if a == b:
+            raise ValueError(f"Paar aus derselben Person: {a}")
+        self.couples.append((a, b))
+        return self
+
+    def forbidden_pairs(self) -> Set[Tuple[str, str]]:
+        """Alle verbotenen Kanten (Giver, Empfänger) aus Ausschlüssen und Paaren."""
+        pairs = {(giver, receiver) for giver, receivers in self.exclusions.items()
+                 for receiver in receivers}
+        for a, b in self.couples:
+            pairs.add((a, b))
+            pairs.add((b, a))
+        return pairs
+
+    def forbidden_masks(self, participants: List[str]) -> List[int]:
+        """
+        Verbotene Empfänger je Giver als Bitmaske über die Indizes von
+        `participants`. Unbekannte Namen sind ein Fehler (Tippfehler würden eine
+        Regel sonst stillschweigend aufheben).
+        """
+        index = {p: i for i, p in enumerate(participants)}
+        masks = [0] * len(participants)
+        for giver, receiver in self.forbidden_pairs():
+            for name in (giver, receiver):
+                if name not in index:
+                    raise ValueError(f"Unbekannter Teilnehmer in den Regeln: {name}")
+            masks[index[giver]] |= 1 << index[receiver]
+        return masks
+
+    def violations(self, assignments: Dict[str, List[str]]) -> List[str]:
+        """Beschreibung jedes Regelverstoßes einer Zuordnung (leer = alles erfüllt)."""
+        forbidden = self.forbidden_pairs()
+        messages = []
+        for giver, receivers in sorted(assignments.items()):
+            for receiver in receivers:
+                if (giver, receiver) in forbidden:
+                    messages.append(f"{giver} darf {receiver} nicht beschenken")
+        if self.no_reciprocal:
+            rounds = max((len(receivers) for receivers in assignments.values()), default=0)
+            for round_idx in range(rounds):
+                perm = {giver: receivers[round_idx] for giver, receivers in assignments.items()
+                        if round_idx < len(receivers)}
+                for giver, receiver in sorted(perm.items()):
+                    if giver < receiver and perm.get(receiver) == giver:
+                        messages.append(f"Runde {round_idx + 1}: {giver} und {receiver} "
+                                        f"beschenken sich gegenseitig")
+        return messages
+
+    def __bool__(self) -> bool:
+        return bool(self.no_reciprocal or self.couples or any(self.exclusions.values()))
+
+
+def has_reciprocal(perm: List[int], givers: Optional[Iterable[int]] = None) -> bool:
+    """Ob in einer Runden-Permutation zwei Personen einander beschenken (optional nur für `givers`)."""
+    if givers is None:
+        givers = range(len(perm))
+    return any(perm[perm[g]] == g for g in givers)
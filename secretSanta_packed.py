@@ -0,0 +1,182 @@
+from array import array
+from typing import List, Dict, Iterable, Iterator, Optional
+
+
+def edge_mask(liste: Dict[str, List[str]], index: Dict[str, int]) -> int:
+    """
+    Adjazenzmatrix einer Zuordnung oder Vorjahresliste als Bitmaske:
+    Bit g·n + r ist gesetzt, wenn Giver g an Empfänger r schenkt.
+
+    Für zwei Masken derselben Teilnehmer gilt
+    (edge_mask(a, index) & edge_mask(b, index)).bit_count() == count_overlaps(a, b),
+    sofern alle Namen in `index` vorkommen (unbekannte werden ignoriert).
+    """
+    n = len(index)
+    mask = 0
+    for giver, receivers in liste.items():
+        g = index.get(giver)
+        if g is None:
+            continue
+        for receiver in receivers:
+            r = index.get(receiver)
+            if r is not None:
+                mask |= 1 << (g * n + r)
+    return mask
+
+
+class PackedAssignments:
+    """
+    Kompakte Sammlung von Zuordnungen derselben Teilnehmer.
+
+    Jede Zuordnung belegt `rounds` Zeilen zu n Einträgen (Empfänger-Index je
+    Giver, also eine Permutation pro Runde) in einem zusammenhängenden array
+    ('B' bis 256 Teilnehmer, sonst 'I'): n · rounds Bytes statt eines
+    Dictionaries mit Namenslisten. Namens-Dictionaries entstehen erst beim
+    Zugriff (Indexierung, Iteration), die Sammlung verhält sich dabei wie eine
+    Liste von Zuordnungen.
+
+    Für die Bewertung gegen Vorjahreslisten wird pro Zuordnung einmalig deren
+    edge_mask berechnet; eine Überschneidung ist dann ein einziges AND mit
+    anschließendem bit_count.
+    """
+
+    def __init__(self, participants: List[str], rounds: int):
+        self.participants = list(participants)
+        self.rounds = rounds
+        self.n = len(self.participants)
+        self._index = {p: i for i, p in enumerate(self.participants)}
+        self.data = array('B' if self.n <= 256 else 'I')
+        self._edge_masks: Optional[List[int]] = None
+
+    @classmethod
+    def from_assignments(cls, participants: List[str], rounds: int,
+                         assignments: Iterable[Dict[str, List[str]]]) -> 'PackedAssignments':
+        packed = cls(participants, rounds)
+        for assignment in assignments:
+            packed.append(assignment)
+        return packed
+
+    def append_perms(self, perms: Iterable[List[int]]):
+        """Hängt eine Zuordnung als Runden-Permutationen (Indizes) an."""
+        start = len(self.data)
+        for perm in perms:
+            self.data.extend(perm)
+        if len(self.data) - start != self.n * self.rounds:
+            del self.data[start:]
+            raise ValueError(f"Erwartet {self.rounds} Runden zu je {self.n} Einträgen")
+        if self._edge_masks is not None:
+            self._edge_masks.append(self._row_mask(start))
+
+    def append(self, assignment: Dict[str, List[str]]):
+        """Hängt eine Zuordnung in Namensform an."""
+        index = self._index
+        self.append_perms([index[assignment[p][k]] for p in self.participants]
+                          for k in range(self.rounds))
+
+    def __len__(self) -> int:
+        return len(self.data) // (self.n * self.rounds) if self.n else 0
+
+    def _offset(self, i: int) -> int:
+        count = len(self)
+        if i < 0:
+            i += count
+        if not 0 <= i < count:
+            raise IndexError("Index außerhalb der Sammlung")
+        return i * self.n * self.rounds
+
+    def perms(self, i: int) -> List[List[int]]:
+        """Zuordnung i als Liste von Runden-Permutationen (Indizes)."""
+        start = self._offset(i)
+        n = self.n
+        return [self.data[start + k * n:start + (k + 1) * n].tolist() for k in range(self.rounds)]
+
+    def __getitem__(self, i: int) -> Dict[str, List[str]]:
+        names = self.participants
+        perms = self.perms(i)
+        return {names[g]: [names[perm[g]] for perm in perms] for g in range(self.n)}
+
+    def __iter__(self) -> Iterator[Dict[str, List[str]]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nbytes(self) -> int:
+        """Größe des gepackten Puffers in Bytes."""
+        return len(self.data) * self.data.itemsize
+
+    def _row_mask(self, start: int) -> int:
+        n = self.n
+        data = self.data
+        mask = 0
+        for offset in range(0, n * self.rounds, n):
+            base = start + offset
+            for g in range(n):
+                mask |= 1 << (g * n + data[base + g])
+        return mask
+
+    def edge_masks(self) -> List[int]:
+        """edge_mask jeder Zuordnung (einmalig berechnet, danach mitgeführt)."""
+        if self._edge_masks is None:
+            step = self.n * self.rounds
+            self._edge_masks = [self._row_mask(start) for start in range(0, len(self.data), step)]
+        return self._edge_masks
+
+    def overlaps(self, liste: Dict[str, List[str]]) -> List[int]:
+        """Überschneidungen jeder Zuordnung mit `liste` (wie count_overlaps)."""
+        history = edge_mask(liste, self._index)
+        return [(mask & history).bit_count() for mask in self.edge_masks()]
+
+    def score(self, lists: List[Dict[str, List[str]]]) -> List[List[int]]:
+        """
+        Überschneidungen aller Zuordnungen mit mehreren Listen auf einmal.
+
+        Returns:
+            Matrix [Zuordnung][Liste] der Überschneidungszahlen
+        """
+        histories = [edge_mask(liste, self._index) for liste in lists]
+        return [[(mask & history).bit_count() for history in histories]
+                for mask in self.edge_masks()]
+
+    def weighted_scores(self, lists: List[Dict[str, List[str]]], weights: List[int]) -> List[int]:
+        """Gewichteter Score jeder Zuordnung (z.B. mit history_weights, neueste Liste zuerst)."""
+        histories = [(edge_mask(liste, self._index), weight) for liste, weight in zip(lists, weights)]
+        return [sum(weight * (mask & history).bit_count() for history, weight in histories)
+                for mask in self.edge_masks()]
+
+    def giver_overlaps(self, i: int, liste: Dict[str, List[str]]) -> List[int]:
+        """Überschneidungen von Zuordnung i mit `liste` pro Giver (in Teilnehmer-Reihenfolge)."""
+        n = self.n
+        common = self.edge_masks()[self._offset(i) // (n * self.rounds)] & edge_mask(liste, self._index)
+        row = (1 << n) - 1
+        return [(common >> (g * n) & row).bit_count() for g in range(n)]
+
+    def overlap_details(self, i: int, liste: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """Wiederholte Empfänger von Zuordnung i pro Giver (nur Giver mit Überschneidung)."""
+        n = self.n
+        names = self.participants
+        common = self.edge_masks()[self._offset(i) // (n * self.rounds)] & edge_mask(liste, self._index)
+        details = {}
+        while common:
+            bit = common & -common
+            common ^= bit
+            g, r = divmod(bit.bit_length() - 1, n)
+            details.setdefault(names[g], []).append(names[r])
+        return details
+
+
+def score_assignments(participants: List[str], assignments: Iterable[Dict[str, List[str]]],
+                      lists: List[Dict[str, List[str]]]) -> List[List[int]]:
+    """
+    Bewertet beliebig viele Zuordnungen (Namensform) gegen mehrere Listen, siehe
+    PackedAssignments.score. Die Rundenzahl wird aus der ersten Zuordnung
+    abgeleitet.
+    """
+    assignments = iter(assignments)
+    first = next(assignments, None)
+    if first is None:
+        return []
+    packed = PackedAssignments(participants, len(first[participants[0]]))
+    packed.append(first)
+    for assignment in assignments:
+        packed.append(assignment)
+    return packed.score(lists)
@@ -0,0 +1,23 @@
+import random
+import unittest
+
+from secretSanta_anneal import anneal_secret_santa
+from secretSanta_constraints import Constraints
+
+
+class AnnealConstraintsTest(unittest.TestCase):
+
+    def test_forbidden_and_reciprocal_edge(self):
+        # Kante eines Paars, die zugleich gegenseitig ist: Der Zähler der Verstöße
+        # lief hier auseinander (negativ bzw. 0 trotz verbleibendem Verstoß)
+        participants = [f"P{i}" for i in range(6)]
+        constraints = Constraints(couples=[("P0", "P3")], no_reciprocal=True)
+        for seed in range(100):
+            with self.subTest(seed=seed):
+                random.seed(seed)
+                result = anneal_secret_santa(participants, 3, constraints=constraints)
+                self.assertEqual(constraints.violations(result['assignment']), [])
+
+
+if __name__ == "__main__":
+    unittest.main()